@@ -1,49 +1,114 @@
 # app.py
 import os
-import uuid
 import json
+import time
+import queue
 import logging
 from flask import (
-    Flask, render_template, request, redirect, url_for, flash,
-    send_file, jsonify
+    Flask, Request, render_template, request, redirect, url_for, flash,
+    send_file, jsonify, Response, stream_with_context
 )
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
 from werkzeug.utils import safe_join
 
 from werkzeug.utils import secure_filename
 
-from src.resume_parser import extract_text_from_pdf
-from src.ats_analyzer import (
-    extract_keywords_from_job, keyword_match_score, extract_skills,
-    years_of_experience, detect_education, format_structure_checks,
-    contact_info_checks, readability_scores, detect_achievements,
-    relevance_score, detect_action_verb_weakness, generic_phrase_detector
-)
+from src.config import UPLOAD_FOLDER, MAX_REQUEST_BYTES, PROFILING_ENABLED, PROFILE_DIR, warm_up
+from src import metrics
+from src.upload_store import save_upload, UploadSpool, DiscardSpool
+from src.pipeline import run_analysis
+from src.job_profile import JobProfile, get_job_profile
+from src.candidate_pool import get_candidate_pool
+from src.jobs import JobQueue, DONE, FAILED
 from src.llm_analyzer import (
-    analyze_resume_via_llm, rewrite_achievement, full_resume_rewrite,
-    generate_linkedin_summary, analyze_linkedin_profile
+    rewrite_achievement, rewrite_achievements, full_resume_rewrite, stream_full_resume_rewrite,
+    generate_linkedin_summary
 )
-from src.embeddings import store_embedding
-from src.matcher import find_best_match
 
-UPLOAD_FOLDER = "data/uploads"
 ALLOWED_EXTENSIONS = {"pdf"}
 MAX_RESUMES = 20
+MAX_BULLETS = 100
+MAX_POOL_RESULTS = 500
+SSE_KEEPALIVE = 5  # seconds between keep-alives / store re-checks on an idle event stream
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+
+class UploadRequest(Request):
+    """
+    Request whose uploaded PDFs are streamed to disk and hashed while the
+    body is read (see UploadSpool); anything else uploaded is discarded.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if filename and allowed_file(filename):
+            return UploadSpool(filename, app.config["UPLOAD_FOLDER"])
+        return DiscardSpool()
+
+
 app = Flask(__name__, static_folder="static", template_folder="templates")
+app.request_class = UploadRequest
 app.secret_key = os.environ.get("FLASK_SECRET_KEY", "super-secret-key")
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
-app.config["MAX_CONTENT_LENGTH"] = 50 * 1024 * 1024  # 50 MB
+app.config["MAX_CONTENT_LENGTH"] = MAX_REQUEST_BYTES
 
 logging.basicConfig(level=logging.INFO)
 LOG = logging.getLogger("app")
 
+# analyses run in a local background worker pool; unfinished jobs resume after a restart
+job_queue = JobQueue(run_analysis)
+job_queue.recover()
+
+# API clients and index discovery are lazy; start them in the background
+warm_up()
+
 
 def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+@app.before_request
+def start_timer():
+    request.started = time.perf_counter()
+
+
+@app.after_request
+def record_latency(response):
+    started = getattr(request, "started", None)
+    if started is not None and request.endpoint != "metrics_route":
+        metrics.observe("http_request_seconds", time.perf_counter() - started,
+                        endpoint=request.endpoint or "unknown", status=response.status_code)
+    return response
+
+
+def wants_json():
+    return request.accept_mimetypes.best_match(["text/html", "application/json"]) == "application/json"
+
+
+@app.errorhandler(RequestEntityTooLarge)
+@app.errorhandler(UnsupportedMediaType)
+def upload_rejected(e):
+    # raised while the body is still being read: a file over the size cap or without a PDF header
+    if wants_json():
+        return jsonify({"error": e.description}), e.code
+    flash(e.description)
+    return redirect(url_for("home"))
+
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def render_results(result):
+    all_results = result["all_results"]
+    top_n = result["top_n"]
+    # Choose top_n (but we always show top 2 side-by-side for comparison if >=2)
+    return render_template("result_dashboard.html",
+                           selected=all_results[:top_n],
+                           top2=all_results[:2] if len(all_results) >= 2 else all_results[:1],
+                           **result)
+
+
 @app.route("/", methods=["GET"])
 def home():
     return render_template("index.html")
@@ -75,120 +140,193 @@ def analyze():
         flash("Job description must be a PDF.")
         return redirect(url_for("home"))
 
-    # Save job file
+    # Save job file (stored once per digest; text parsed at most once)
     job_filename_orig = secure_filename(job_file.filename)
-    job_saved_name = f"{uuid.uuid4()}_{job_filename_orig}"
-    job_path = os.path.join(app.config["UPLOAD_FOLDER"], job_saved_name)
-    job_file.save(job_path)
-    with open(job_path, "rb") as jf:
-        job_text = extract_text_from_pdf(jf)
-
-    # LinkedIn analysis (best-effort)
-    linkedin_analysis = None
-    if linkedin_url:
-        try:
-            linkedin_analysis = analyze_linkedin_profile(linkedin_url)
-        except Exception as e:
-            LOG.exception("LinkedIn analysis error: %s", e)
-            linkedin_analysis = {"error": "LinkedIn fetch/analysis failed. Try pasting profile text."}
+    with metrics.timed("upload_save"):
+        job_digest, job_saved_name, job_path = save_upload(job_file, app.config["UPLOAD_FOLDER"])
 
-    # Process each resume, compute scores and LLM analysis
-    all_results = []
+    # Save each resume (stored once per digest)
+    uploads = []
     for f in resume_files:
         if not f or f.filename == "":
             continue
         if not allowed_file(f.filename):
             continue
-
         orig_name = secure_filename(f.filename)
-        saved_name = f"{uuid.uuid4()}_{orig_name}"
-        saved_path = os.path.join(app.config["UPLOAD_FOLDER"], saved_name)
-        f.save(saved_path)
-
-        # Extract text
-        with open(saved_path, "rb") as rf:
-            resume_text = extract_text_from_pdf(rf)
-
-        # store embedding best-effort
-        try:
-            store_embedding(str(uuid.uuid4()), (resume_text[:2000] or " "), {"filename": orig_name})
-        except Exception:
-            LOG.exception("Embedding store failed; continuing.")
-
-        # ATS core features
-        job_kws = extract_keywords_from_job(job_text, top_n=40)
-        kw_score, matched_kws, missing_kws = keyword_match_score(resume_text, job_kws)
-        skills_found = extract_skills(resume_text)
-        yrs = years_of_experience(resume_text)
-        edu = detect_education(resume_text)
-        format_checks = format_structure_checks(resume_text)
-        contact = contact_info_checks(resume_text)
-        readability = readability_scores(resume_text)
-        achievements = detect_achievements(resume_text)
-        generic_phrases = generic_phrase_detector(resume_text)
-        weak_verbs = detect_action_verb_weakness(resume_text)
-        rel_score = relevance_score(kw_score, len(skills_found), len(achievements), yrs)
-
-        # LLM analysis (best-effort, may be non-JSON fallback)
-        try:
-            llm_analysis = analyze_resume_via_llm(resume_text, job_text)
-        except Exception:
-            LOG.exception("LLM analysis failed for file: %s", orig_name)
-            llm_analysis = {"raw": "LLM analysis failed."}
-
-        all_results.append({
+        with metrics.timed("upload_save"):
+            digest, saved_name, saved_path = save_upload(f, app.config["UPLOAD_FOLDER"])
+        uploads.append({
             "orig_name": orig_name,
             "saved_name": saved_name,
             "saved_path": saved_path,
-            "kw_score": kw_score,
-            "matched_kws": matched_kws,
-            "missing_kws": missing_kws,
-            "skills_found": skills_found,
-            "yrs": yrs,
-            "edu": edu,
-            "format_checks": format_checks,
-            "contact": contact,
-            "readability": readability,
-            "achievements": achievements,
-            "generic_phrases": generic_phrases,
-            "weak_verbs": weak_verbs,
-            "rel_score": rel_score,
-            "llm_analysis": llm_analysis
+            "digest": digest
         })
 
-    if len(all_results) == 0:
+    if len(uploads) == 0:
         flash("No valid resumes uploaded.")
         return redirect(url_for("home"))
 
-    # Sort by relevance score desc
-    all_results.sort(key=lambda x: x["rel_score"], reverse=True)
-
-    # Determine how many to show/use: top_n between 1 and len(results)
-    top_n = max(1, min(len(all_results), top_n))
+    # Parsing, scoring, embeddings and LLM analysis run as a background job
+    job_id = job_queue.submit({
+        "job_path": job_path,
+        "job_digest": job_digest,
+        "job_filename": job_filename_orig,
+        "job_saved_name": job_saved_name,
+        "job_title": job_title,
+        "linkedin_url": linkedin_url,
+        "top_n": top_n,
+        "uploads": uploads,
+        # cProfile report of this one run (only when profiling is enabled on the server)
+        "profile": PROFILING_ENABLED and request.values.get("profile") == "1"
+    })
+    if wants_json():
+        return jsonify({
+            "job_id": job_id,
+            "status_url": url_for("job_status", job_id=job_id),
+            "events_url": url_for("job_events", job_id=job_id),
+            "result_url": url_for("job_result", job_id=job_id)
+        }), 202
+    return redirect(url_for("job_result", job_id=job_id))
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = job_queue.store.get(job_id)
+    if job is None:
+        return jsonify({"error": "job not found"}), 404
+    return jsonify({
+        "job_id": job_id,
+        "status": job["status"],
+        "error": job["error"],
+        "progress": job["progress"],
+        "result_url": url_for("job_result", job_id=job_id)
+    })
+
+
+@app.route("/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    """
+    Server-Sent Events for one job: a "snapshot" of the current progress,
+    then "stage" and "resume" events as each resume is scored and analyzed,
+    ending with "done" or "failed".
+    """
+    events = job_queue.events
+    subscription = events.subscribe(job_id)
+    job = job_queue.store.get(job_id)
+    if job is None:
+        events.unsubscribe(job_id, subscription)
+        return jsonify({"error": "job not found"}), 404
+
+    def terminal(job):
+        if job["status"] == DONE:
+            return sse(DONE, {"result_url": url_for("job_result", job_id=job_id)})
+        return sse(FAILED, {"error": job["error"] or "Analysis failed."})
+
+    def stream():
+        try:
+            yield sse("snapshot", {"status": job["status"], "progress": job["progress"]})
+            if job["status"] in (DONE, FAILED):
+                yield terminal(job)
+                return
+            updated = job["updated"]
+            while True:
+                try:
+                    event, data = subscription.get(timeout=SSE_KEEPALIVE)
+                except queue.Empty:
+                    # the job may be running in another server process; fall back to the store
+                    current = job_queue.store.get(job_id)
+                    if current["status"] in (DONE, FAILED):
+                        yield terminal(current)
+                        return
+                    if current["updated"] != updated:
+                        updated = current["updated"]
+                        yield sse("snapshot", {"status": current["status"], "progress": current["progress"]})
+                    else:
+                        yield ": keep-alive\n\n"
+                    continue
+                if event == DONE:
+                    data = {"result_url": url_for("job_result", job_id=job_id)}
+                yield sse(event, data)
+                if event in (DONE, FAILED):
+                    return
+        finally:
+            events.unsubscribe(job_id, subscription)
+
+    return Response(stream_with_context(stream()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route("/jobs/<job_id>/result", methods=["GET"])
+def job_result(job_id):
+    job = job_queue.store.get(job_id, with_result=True)
+    if job is None:
+        if wants_json():
+            return jsonify({"error": "job not found"}), 404
+        flash("Analysis not found.")
+        return redirect(url_for("home"))
+    if wants_json():
+        if job["status"] != DONE:
+            return jsonify({"job_id": job_id, "status": job["status"], "error": job["error"]}), 409
+        return jsonify(job["result"])
+    if job["status"] == FAILED:
+        flash(job["error"] or "Analysis failed.")
+        return redirect(url_for("home"))
+    if job["status"] != DONE:
+        # live progress page; static/js/main.js follows /jobs/<id>/events and reloads when it is done
+        return render_template("result_dashboard.html", pending=True, job_id=job_id,
+                               progress=job["progress"], job_title=job["params"].get("job_title"),
+                               selected=[], top_n=0)
+    return render_results(job["result"])
+
+
+@app.route("/jobs/<job_id>/profile", methods=["GET"])
+def job_profile_report(job_id):
+    job = job_queue.store.get(job_id, with_result=True)
+    name = ((job or {}).get("result") or {}).get("profile")
+    if not name:
+        return jsonify({"error": "no profile for this job"}), 404
+    return send_file(os.path.join(os.path.abspath(PROFILE_DIR), name + ".txt"), mimetype="text/plain")
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_route():
+    # Prometheus text format: stage latency histograms, LLM/embedding counters, cache hit rates
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/pool/rank", methods=["POST"])
+def pool_rank():
+    """
+    Rank every resume in the candidate pool against a job description, given
+    as an uploaded PDF ("job") or as text ("job_text"), without re-parsing
+    any resume. Returns the top_n candidates as JSON.
+    """
+    data = request.get_json(silent=True) or request.form
+    try:
+        top_n = max(1, min(MAX_POOL_RESULTS, int(data.get("top_n", 50))))
+    except (TypeError, ValueError):
+        return jsonify({"error": "top_n must be an integer"}), 400
+    job_file = request.files.get("job")
+    if job_file and allowed_file(job_file.filename):
+        with metrics.timed("upload_save"):
+            job_digest, _, job_path = save_upload(job_file, app.config["UPLOAD_FOLDER"])
+        job = get_job_profile(job_digest, job_path)
+    elif (data.get("job_text") or "").strip():
+        job = JobProfile.from_text(data["job_text"])
+    else:
+        return jsonify({"error": "upload a job description PDF or provide job_text"}), 400
 
-    # Choose top_n (but we always show top 2 side-by-side for comparison if >=2)
-    selected = all_results[:top_n]
-    top2 = all_results[:2] if len(all_results) >= 2 else all_results[:1]
+    pool = get_candidate_pool()
+    with metrics.timed("pool_rank"):
+        results = pool.rank(job, top_n=top_n)
+    return jsonify({"pool_size": len(pool), "job_keywords": job.keywords, "results": results})
 
-    # Similarity search on best resume (top 1)
-    try:
-        best_resume_text = ""
-        with open(all_results[0]["saved_path"], "rb") as br:
-            best_resume_text = extract_text_from_pdf(br)
-        similarity = find_best_match(best_resume_text, top_k=5)
-    except Exception:
-        similarity = {"matches": []}
 
-    return render_template("result_dashboard.html",
-                           job_filename=job_filename_orig,
-                           job_saved_name=job_saved_name,
-                           top_n=top_n,
-                           selected=selected,
-                           top2=top2,
-                           all_results=all_results,
-                           similarity=similarity,
-                           job_title=job_title,
-                           linkedin_analysis=linkedin_analysis)
+@app.route("/pool/<digest>", methods=["DELETE"])
+def pool_remove(digest):
+    if not get_candidate_pool().remove(digest):
+        return jsonify({"error": "not in the candidate pool"}), 404
+    return jsonify({"removed": digest})
 
 
 @app.route("/rewrite_bullet", methods=["POST"])
@@ -205,6 +343,24 @@ def rewrite_bullet_route():
         return jsonify({"error": "rewrite failed"}), 500
 
 
+@app.route("/rewrite_bullets", methods=["POST"])
+def rewrite_bullets_route():
+    data = request.json or {}
+    bullets = data.get("bullets") or []
+    style = data.get("style", "quantified")
+    if not isinstance(bullets, list) or not bullets or not all(isinstance(b, str) and b.strip() for b in bullets):
+        return jsonify({"error": "bullets must be a non-empty list of strings"}), 400
+    if len(bullets) > MAX_BULLETS:
+        return jsonify({"error": f"at most {MAX_BULLETS} bullets per request"}), 400
+    try:
+        rewritten = rewrite_achievements(bullets, target_style=style)
+    except Exception as e:
+        LOG.exception("bulk rewrite failed: %s", e)
+        return jsonify({"error": "rewrite failed"}), 500
+    # one entry per input bullet; null where that bullet could not be rewritten
+    return jsonify({"rewritten": rewritten, "failed": [i for i, r in enumerate(rewritten) if r is None]})
+
+
 @app.route("/rewrite_full", methods=["POST"])
 def rewrite_full_route():
     data = request.json or {}
@@ -221,6 +377,37 @@ def rewrite_full_route():
         return jsonify({"error": "rewrite failed"}), 500
 
 
+@app.route("/rewrite_full/stream", methods=["POST"])
+def rewrite_full_stream_route():
+    """
+    Streaming /rewrite_full: Server-Sent Events with "chunk" events ({"text"})
+    as the model writes, then "done" (or "error"). Closing the connection
+    cancels the completion.
+    """
+    data = request.json or {}
+    resume = data.get("resume", "")
+    job = data.get("job", "")
+    tone = data.get("tone", "leadership")
+    if not resume or not job:
+        return jsonify({"error": "resume and job required"}), 400
+
+    def stream():
+        chunks = stream_full_resume_rewrite(resume, job, tone=tone)
+        try:
+            for text in chunks:
+                yield sse("chunk", {"text": text})
+            yield sse("done", {})
+        except Exception as e:
+            LOG.exception("streamed rewrite failed: %s", e)
+            yield sse("error", {"error": "rewrite failed"})
+        finally:
+            # runs on client disconnect too, cancelling the upstream completion
+            chunks.close()
+
+    return Response(stream_with_context(stream()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @app.route("/download/<path:filename>")
 def download_file(filename):
     # Serve saved file (inline viewing)
@@ -0,0 +1,68 @@
+# benchmarks/bench_candidate_pool.py
+"""
+Benchmark candidate pool inserts and pool-wide ranking of a new job.
+
+    python -m benchmarks.bench_candidate_pool --candidates 100000
+
+Resumes come from the synthetic corpus (text only, no PDFs). Their ATS
+reports are computed for --distinct texts and reused across the pool, so
+building a 100k pool is dominated by the pool inserts themselves.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--candidates", type=int, default=20000, help="resumes in the pool")
+    ap.add_argument("--distinct", type=int, default=500, help="distinct resume texts to cycle through")
+    ap.add_argument("--batch", type=int, default=1000, help="candidates per add_many transaction")
+    ap.add_argument("--queries", type=int, default=5, help="jobs ranked against the full pool")
+    ap.add_argument("--top", type=int, default=50)
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="pool-bench-")
+    os.environ["CACHE_DIR"] = os.path.join(workdir, "cache")
+    try:
+        from benchmarks.corpus import make_job_lines, make_resume_lines
+        from src.ats_analyzer import ResumeFeatures
+        from src.candidate_pool import CandidatePool
+        from src.job_profile import JobProfile
+
+        jobs = [JobProfile.from_text("\n".join(make_job_lines("medium", seed))) for seed in range(args.queries)]
+        templates = []
+        for i in range(min(args.distinct, args.candidates)):
+            text = "\n".join(make_resume_lines(("small", "medium", "large")[i % 3], i))
+            templates.append((text, ResumeFeatures(text).report(jobs[0])))
+
+        pool = CandidatePool(os.path.join(workdir, "candidates.sqlite"))
+        start = time.perf_counter()
+        for lo in range(0, args.candidates, args.batch):
+            pool.add_many((f"digest-{i}", f"resume-{i}.pdf", *templates[i % len(templates)])
+                          for i in range(lo, min(args.candidates, lo + args.batch)))
+        seconds = time.perf_counter() - start
+        size_mb = os.path.getsize(os.path.join(workdir, "candidates.sqlite")) / 2 ** 20
+        print(f"insert   {args.candidates} candidates in {seconds:.2f}s "
+              f"({args.candidates / seconds:.0f}/s), db {size_mb:.1f} MB")
+
+        timings = []
+        for job in jobs:
+            start = time.perf_counter()
+            pool.rank(job, top_n=args.top)
+            timings.append(time.perf_counter() - start)
+        print(f"rank     {len(jobs)} jobs x {args.candidates} candidates: "
+              f"best {min(timings):.3f}s, mean {sum(timings) / len(timings):.3f}s")
+
+        start = time.perf_counter()
+        for i in range(0, min(100, args.candidates)):
+            pool.remove(f"digest-{i}")
+        print(f"remove   {min(100, args.candidates)} candidates in {time.perf_counter() - start:.3f}s")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# benchmarks/bench_pipeline.py
+"""
+Benchmark PDF parsing, ATS scoring and the full /analyze pipeline on a synthetic corpus.
+
+    python -m benchmarks.bench_pipeline --resumes 50 --sizes small,medium,large
+    python -m benchmarks.bench_pipeline --save-baseline          # record benchmarks/baseline.json
+    python -m benchmarks.bench_pipeline --compare                # diff against it
+
+Everything runs offline: OpenAI and Pinecone are replaced by stubs with a
+fixed latency (--llm-latency, --embedding-latency), caches and uploads go to
+a temporary directory, and the LLM cache is off so every run does the same
+work. Per stage it reports wall time, ms per resume, resumes/sec (ms per
+job and jobs/sec for the job_profile stage, which handles one job) and the
+peak Python heap of the main process (tracemalloc, measured in a separate
+pass so it does not slow the timed one).
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def _configure_env(workdir):
+    # must run before anything under src/ is imported: settings are read at import time
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ["CACHE_DIR"] = os.path.join(workdir, "cache")
+    os.environ["UPLOAD_FOLDER"] = os.path.join(workdir, "uploads")
+    os.environ["JOBS_DB"] = os.path.join(workdir, "jobs.sqlite")
+    os.environ["CANDIDATES_DB"] = os.path.join(workdir, "candidates.sqlite")
+    os.environ["LLM_CACHE_ENABLED"] = "0"
+    os.environ["VECTOR_BACKEND"] = "pinecone"
+
+
+class TimingProgress:
+    """run_analysis progress sink that records how long each stage took."""
+
+    def __init__(self):
+        self.stages = {}
+        self._current = None
+        self._since = None
+
+    def stage(self, name):
+        now = time.perf_counter()
+        if self._current:
+            self.stages[self._current] = self.stages.get(self._current, 0.0) + now - self._since
+        self._current, self._since = name, now
+
+    def resume(self, index, status, data=None):
+        pass
+
+    def finish(self):
+        self.stage(None)
+        return self.stages
+
+
+def _measure(fn, n_items, memory, unit="resume"):
+    start = time.perf_counter()
+    extra = fn()
+    seconds = time.perf_counter() - start
+    result = {
+        "seconds": round(seconds, 4),
+        f"ms_per_{unit}": round(seconds * 1000 / max(1, n_items), 3),
+        f"{unit}s_per_sec": round(n_items / seconds, 2) if seconds else None,
+    }
+    if memory:
+        tracemalloc.start()
+        fn()
+        result["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+        tracemalloc.stop()
+    if isinstance(extra, dict):
+        result.update(extra)
+    return result
+
+
+def _unit(result):
+    """What a stage's per-item figures count: "resume", or "job" for job_profile."""
+    return "job" if "ms_per_job" in result else "resume"
+
+
+def bench_size(size, n_resumes, workdir, memory, seed=0):
+    from benchmarks.corpus import build_corpus
+    from src.resume_parser import extract_text_from_pdf
+    from src.ats_analyzer import ResumeFeatures
+    from src.job_profile import JobProfile
+    from src.readability import readability_stats, count_syllables
+    from src.upload_store import save_upload
+    from src.pipeline import run_analysis
+
+    corpus = os.path.join(workdir, "corpus", size)
+    job_path, resume_paths = build_corpus(corpus, n_resumes, size=size, seed=seed)
+    results = {}
+
+    def extract_all():
+        out = []
+        for path in resume_paths:
+            with open(path, "rb") as fh:
+                out.append(extract_text_from_pdf(fh))
+        return out
+
+    texts = extract_all()
+    with open(job_path, "rb") as fh:
+        job_text = extract_text_from_pdf(fh)
+    results["pdf_extract"] = _measure(extract_all, n_resumes, memory)
+
+    results["job_profile"] = _measure(lambda: JobProfile.from_text(job_text), 1, memory, unit="job")
+    profile = JobProfile.from_text(job_text)
+    # ResumeFeatures directly, bypassing analyze_resume's LRU cache
+    def readability_all():
+        count_syllables.cache_clear()  # cold syllable cache, as for a new worker
+        return [readability_stats(t) for t in texts]
+
+    results["readability"] = _measure(readability_all, n_resumes, memory)
+    results["ats_score"] = _measure(lambda: [ResumeFeatures(t).report(profile) for t in texts], n_resumes, memory)
+
+    def pipeline(run_id=[0]):
+        # fresh upload folder each run: the pipeline parses every PDF from scratch
+        run_id[0] += 1
+        folder = os.path.join(workdir, "uploads", f"{size}-{run_id[0]}")
+
+        def store(path):
+            with open(path, "rb") as fh:
+                return save_upload(types.SimpleNamespace(stream=fh), folder)
+
+        job_digest, job_saved_name, job_saved_path = store(job_path)
+        uploads = []
+        for path in resume_paths:
+            digest, saved_name, saved_path = store(path)
+            uploads.append({"orig_name": os.path.basename(path), "saved_name": saved_name,
+                            "saved_path": saved_path, "digest": digest})
+        progress = TimingProgress()
+        run_analysis({"job_path": job_saved_path, "job_digest": job_digest, "job_filename": "job.pdf",
+                      "job_saved_name": job_saved_name, "job_title": "Benchmark", "linkedin_url": "",
+                      "top_n": 3, "uploads": uploads}, progress)
+        return {"stages": {k: round(v, 4) for k, v in progress.finish().items()}}
+
+    results["pipeline"] = _measure(pipeline, n_resumes, memory)
+    return results
+
+
+def compare(current, baseline, threshold):
+    """Print per-stage changes against a baseline; returns the regressions beyond threshold (fraction)."""
+    regressions = []
+    print(f"\nvs baseline ({baseline['meta'].get('timestamp', '?')}):")
+    for size, stages in current["results"].items():
+        for stage, result in stages.items():
+            # per-resume (per-job) cost, so runs with different --resumes still compare
+            unit = _unit(result)
+            key = f"ms_per_{unit}"
+            before = baseline["results"].get(size, {}).get(stage)
+            if not before or not before.get(key):
+                continue
+            change = result[key] / before[key] - 1
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions.append((size, stage, change))
+            print(f"  {size:<7} {stage:<12} {before[key]:>9.2f} -> {result[key]:>9.2f} ms/{unit:<6}"
+                  f"  {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--resumes", type=int, default=30, help="resumes per size")
+    ap.add_argument("--sizes", default="small,medium,large", help="comma-separated: small, medium, large")
+    ap.add_argument("--llm-latency", type=float, default=0.0, help="seconds per stubbed chat completion")
+    ap.add_argument("--embedding-latency", type=float, default=0.0, help="seconds per stubbed embeddings call")
+    ap.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--save-baseline", action="store_true", help=f"write results to {BASELINE}")
+    ap.add_argument("--compare", nargs="?", const=BASELINE, help="baseline JSON to compare with")
+    ap.add_argument("--threshold", type=float, default=0.10, help="slowdown counted as a regression")
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="resume-bench-")
+    _configure_env(workdir)
+    try:
+        from src import config
+        from src.config import EMBEDDING_DIM
+        from benchmarks.stubs import StubOpenAI, StubIndex
+        config.set_clients(openai_client=StubOpenAI(args.llm_latency, args.embedding_latency, EMBEDDING_DIM),
+                           index=StubIndex())
+
+        report = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "command": "python -m benchmarks.bench_pipeline " + " ".join(sys.argv[1:]),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "ats_workers": config.ATS_WORKERS,
+                "args": vars(args),
+            },
+            "results": {},
+        }
+        for size in [s.strip() for s in args.sizes.split(",") if s.strip()]:
+            results = bench_size(size, args.resumes, workdir, memory=not args.no_memory)
+            report["results"][size] = results
+            print(f"\n[{size}] {args.resumes} resumes")
+            for stage, r in results.items():
+                mem = f"  peak {r['peak_mb']:>7.2f} MB" if "peak_mb" in r else ""
+                unit = _unit(r)
+                print(f"  {stage:<12} {r['seconds']:>9.3f}s  {r[f'ms_per_{unit}']:>9.2f} ms/{unit:<6}  "
+                      f"{r[f'{unit}s_per_sec'] or 0:>9.1f} {unit}s/s{mem}")
+                for name, seconds in r.get("stages", {}).items():
+                    print(f"      {name:<28} {seconds:>8.3f}s")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for path in filter(None, [args.out, BASELINE if args.save_baseline else None]):
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\nresults written to {path}")
+
+    if args.compare:
+        if not os.path.exists(args.compare):
+            print(f"\nno baseline at {args.compare}; run with --save-baseline first")
+            return
+        with open(args.compare, encoding="utf-8") as fh:
+            regressions = compare(report, json.load(fh), args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# benchmarks/bench_skill_index.py
+"""
+Compare the compiled SkillIndex with the old per-skill fuzzywuzzy scan.
+
+    python -m benchmarks.bench_skill_index --skills 10000 --resumes 20
+
+The legacy scan is O(skills x tokens), so it is only run up to --legacy-max
+skills and extrapolated linearly beyond that.
+"""
+import argparse
+import random
+import re
+import time
+
+from src.skill_index import SkillIndex
+
+SYLLABLES = [c + v for c in "bcdfghjklmnprstvwz" for v in "aeiou"]
+# resume-style skill lists with compound tokens; every expected skill must be found
+RECALL_CASES = [
+    ("Python/Django/Flask, React.js, AWS-certified, SQL; Docker/Kubernetes, C++, CI/CD",
+     ["aws", "c++", "ci/cd", "django", "docker", "flask", "kubernetes", "python", "react", "sql"]),
+    ("Node.js and Vue.js front ends, machine-learning pipelines on GCP/Azure",
+     ["azure", "gcp", "machine learning", "node.js", "vue.js"]),
+]
+WORDS = ["developed", "managed", "team", "systems", "using", "with", "the", "and", "data", "platform",
+         "improved", "services", "customers", "delivered", "design", "built", "for", "across", "cloud"]
+
+
+def make_skill_bank(n, seed=7):
+    rnd = random.Random(seed)
+    bank = set()
+    while len(bank) < n:
+        words = ["".join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4))) for _ in range(rnd.randint(1, 3))]
+        bank.add(" ".join(words))
+    return sorted(bank)
+
+
+def make_resume(bank, n_words=600, seed=0):
+    rnd = random.Random(seed)
+    words = []
+    for _ in range(n_words):
+        if rnd.random() < 0.05:
+            skill = rnd.choice(bank)
+            if rnd.random() < 0.3 and len(skill) > 6:
+                # drop a character to exercise the fuzzy stage
+                i = rnd.randrange(1, len(skill) - 1)
+                skill = skill[:i] + skill[i + 1:]
+            words.append(skill)
+        else:
+            words.append(rnd.choice(WORDS))
+    return " ".join(words)
+
+
+def legacy_extract_skills(resume_text, skills_bank):
+    from fuzzywuzzy import process
+    text = resume_text.lower()
+    found = set(sk for sk in skills_bank if sk in text)
+    tokens = re.findall(r'\b[a-zA-Z\+\-\.]{2,}\b', text)
+    for sk in skills_bank:
+        choice, score = process.extractOne(sk, tokens)
+        if score > 90:
+            found.add(sk)
+    return sorted(found)
+
+
+def check_recall():
+    """Match RECALL_CASES against the built-in skill bank; returns the number of misses."""
+    from src.ats_analyzer import DEFAULT_SKILLS
+    index = SkillIndex(DEFAULT_SKILLS)
+    misses = 0
+    for text, expected in RECALL_CASES:
+        found = index.match(text)
+        missing = sorted(set(expected) - set(found))
+        misses += len(missing)
+        print(f"recall      {len(expected) - len(missing)}/{len(expected)}  {text[:48]!r}"
+              + (f"  missing {missing}" if missing else ""))
+    return misses
+
+
+def _time_per_resume(fn, resumes):
+    start = time.perf_counter()
+    for r in resumes:
+        fn(r)
+    return (time.perf_counter() - start) / len(resumes)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--skills", type=int, default=10000, help="taxonomy size")
+    ap.add_argument("--resumes", type=int, default=20)
+    ap.add_argument("--words", type=int, default=600, help="words per synthetic resume")
+    ap.add_argument("--legacy-max", type=int, default=50, help="largest bank to run the legacy scan on")
+    args = ap.parse_args()
+
+    if check_recall():
+        raise SystemExit("skill recall check failed")
+
+    bank = make_skill_bank(args.skills)
+    resumes = [make_resume(bank, args.words, seed=i) for i in range(args.resumes)]
+
+    start = time.perf_counter()
+    index = SkillIndex(bank)
+    build = time.perf_counter() - start
+    per_resume = _time_per_resume(index.match, resumes)
+    print(f"SkillIndex  skills={len(bank):>6}  build={build * 1000:8.1f} ms  match={per_resume * 1000:8.2f} ms/resume")
+
+    if args.legacy_max <= 0:
+        return
+    try:
+        import fuzzywuzzy  # noqa: F401
+    except ImportError:
+        print("fuzzywuzzy not installed; skipping legacy comparison.")
+        return
+    legacy_bank = bank[:min(len(bank), args.legacy_max)]
+    legacy_resumes = resumes[:3]
+    legacy = _time_per_resume(lambda r: legacy_extract_skills(r, legacy_bank), legacy_resumes)
+    projected = legacy * len(bank) / len(legacy_bank)
+    print(f"legacy      skills={len(legacy_bank):>6}  match={legacy * 1000:8.2f} ms/resume")
+    print(f"legacy (projected to {len(bank)} skills): {projected:8.2f} s/resume  -> {projected / per_resume:,.0f}x slower")
+
+
+if __name__ == "__main__":
+    main()
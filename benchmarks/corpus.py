@@ -0,0 +1,114 @@
+# benchmarks/corpus.py
+"""
+Deterministic synthetic resumes and job descriptions, as text and as PDFs.
+
+The same (size, seed) always yields the same document, so timings from
+different runs and machines are comparable. PDFs are written directly
+(Helvetica text, one content stream per page) so no PDF library is needed.
+"""
+import os
+import random
+
+# lines per document body, roughly 1, 2 and 5 pages
+SIZES = {"small": 45, "medium": 110, "large": 280}
+LINES_PER_PAGE = 60
+
+FIRST = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn"]
+LAST = ["Khan", "Smith", "Garcia", "Chen", "Okafor", "Novak", "Silva", "Ahmed", "Rossi", "Kim"]
+TITLES = ["Software Engineer", "Data Scientist", "Backend Developer", "DevOps Engineer", "ML Engineer",
+          "Product Analyst", "Frontend Developer", "Platform Engineer"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries", "Wayne Tech"]
+TECH = ["python", "java", "sql", "aws", "docker", "kubernetes", "react", "node.js", "tensorflow", "pytorch",
+        "machine learning", "data analysis", "communication", "leadership", "project management", "terraform",
+        "graphql", "linux", "c++", "go", "spark", "airflow", "postgresql", "redis", "kafka", "ci/cd"]
+VERBS = ["Built", "Led", "Designed", "Increased", "Reduced", "Migrated", "Automated", "Delivered", "Improved",
+         "Helped", "Worked on", "Responsible for"]
+OBJECTS = ["the payments platform", "a real-time analytics pipeline", "customer onboarding services",
+           "the internal developer portal", "search ranking models", "the data warehouse", "REST APIs",
+           "the mobile backend", "monitoring and alerting", "the recommendation engine"]
+OUTCOMES = ["cutting latency by {n}%", "saving ${n}000 per year", "growing revenue {n}%",
+            "for {n} enterprise customers", "with a team of {n}", "reducing incidents {n}%"]
+FILLER = ["Collaborated with cross-functional teams to ship features on schedule.",
+          "Mentored junior engineers and ran code reviews.",
+          "Wrote design documents and presented them to stakeholders.",
+          "Hardworking team player with excellent communication skills.",
+          "Participated in on-call rotation and incident reviews."]
+
+
+def make_resume_lines(size="medium", seed=0):
+    rnd = random.Random(f"resume-{size}-{seed}")
+    n_lines = SIZES[size]
+    name = f"{rnd.choice(FIRST)} {rnd.choice(LAST)}"
+    handle = name.lower().replace(" ", ".")
+    lines = [name, f"{handle}@example.com | +1 555 {rnd.randint(100, 999)} {rnd.randint(1000, 9999)}",
+             f"linkedin.com/in/{handle.replace('.', '-')}", "", "Summary",
+             f"{rnd.choice(TITLES)} with {rnd.randint(2, 15)} years of experience in "
+             f"{', '.join(rnd.sample(TECH, 3))}.", "", "Experience"]
+    year = 2024
+    while len(lines) < n_lines - 12:
+        start = year - rnd.randint(1, 4)
+        lines += ["", f"{rnd.choice(TITLES)}, {rnd.choice(COMPANIES)} {start} - {year}"]
+        year = start
+        for _ in range(rnd.randint(3, 6)):
+            bullet = f"- {rnd.choice(VERBS)} {rnd.choice(OBJECTS)} using {', '.join(rnd.sample(TECH, 2))}"
+            if rnd.random() < 0.6:
+                bullet += ", " + rnd.choice(OUTCOMES).format(n=rnd.randint(2, 60))
+            lines.append(bullet + ".")
+        if rnd.random() < 0.5:
+            lines.append(rnd.choice(FILLER))
+    lines += ["", "Skills", ", ".join(rnd.sample(TECH, rnd.randint(6, 12))),
+              "", "Education", f"B.Sc. Computer Science, University of {rnd.choice(LAST)} {year - 4}"]
+    if rnd.random() < 0.5:
+        lines.append(f"M.Sc. Data Science, Institute of Technology {year - 2}")
+    return lines
+
+
+def make_job_lines(size="medium", seed=0):
+    rnd = random.Random(f"job-{size}-{seed}")
+    title = rnd.choice(TITLES)
+    lines = [f"{title} - {rnd.choice(COMPANIES)}", "", "About the role",
+             f"We are hiring a senior {title.lower()} to join our platform team.", "", "Requirements"]
+    for _ in range(max(6, SIZES[size] // 6)):
+        lines.append(f"- {rnd.randint(2, 8)}+ years of experience with {', '.join(rnd.sample(TECH, 2))}.")
+    lines += ["", "Nice to have"] + [f"- Experience with {t}." for t in rnd.sample(TECH, 4)]
+    return lines
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("latin-1", "replace").decode("latin-1")
+
+
+def write_pdf(lines, path):
+    """Write lines as a plain-text PDF, LINES_PER_PAGE lines per page."""
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    n = len(pages)
+    # objects: 1 catalog, 2 pages, 3 font, then (page, contents) per page
+    objs = ["<< /Type /Catalog /Pages 2 0 R >>",
+            "<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{4 + 2 * i} 0 R" for i in range(n)), n),
+            "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    for i, page in enumerate(pages):
+        content = "BT /F1 10 Tf 50 770 Td 12 TL\n" + "".join(f"({_pdf_escape(l)}) Tj T*\n" for l in page) + "ET"
+        objs.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {5 + 2 * i} 0 R "
+                    "/Resources << /Font << /F1 3 0 R >> >> >>")
+        objs.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as fh:
+        fh.write(out)
+    return path
+
+
+def build_corpus(folder, n_resumes, size="medium", seed=0):
+    """Write one job PDF and n_resumes resume PDFs under folder; returns (job_path, resume_paths)."""
+    os.makedirs(folder, exist_ok=True)
+    job_path = write_pdf(make_job_lines(size, seed), os.path.join(folder, f"job-{size}-{seed}.pdf"))
+    resume_paths = [write_pdf(make_resume_lines(size, seed * 100000 + i), os.path.join(folder, f"resume-{size}-{i}.pdf"))
+                    for i in range(n_resumes)]
+    return job_path, resume_paths
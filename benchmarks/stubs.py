@@ -0,0 +1,100 @@
+# benchmarks/stubs.py
+"""
+Offline stand-ins for the OpenAI client and the Pinecone index, with a fixed
+per-call latency, so the pipeline can be benchmarked without network access
+or API spend.
+"""
+import json
+import threading
+import time
+import types
+import zlib
+
+import numpy as np
+
+
+class _Completions:
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def create(self, model=None, messages=None, max_tokens=None, stream=False, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        text = json.dumps({
+            "strengths": ["Relevant experience"], "missing_skills": ["Kafka"], "fit_score": 70,
+            "quick_recommendation": "Interview", "tone": "technical",
+            "suggested_roles": [{"role": "Engineer", "confidence": 80}],
+        })
+        usage = types.SimpleNamespace(prompt_tokens=sum(len(m["content"]) // 4 for m in messages),
+                                      completion_tokens=len(text) // 4, total_tokens=0)
+        if stream:
+            return _Stream(text)
+        message = types.SimpleNamespace(content=text)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+
+
+class _Stream:
+    def __init__(self, text):
+        self.text = text
+
+    def __iter__(self):
+        for i in range(0, len(self.text), 16):
+            delta = types.SimpleNamespace(content=self.text[i:i + 16])
+            yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)])
+
+    def close(self):
+        pass
+
+
+class _Embeddings:
+    def __init__(self, latency, dim):
+        self.latency = latency
+        self.dim = dim
+        self.calls = 0
+
+    def create(self, model=None, input=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        data = []
+        for i, text in enumerate(input):
+            # deterministic pseudo-embedding per text
+            rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+            data.append(types.SimpleNamespace(index=i, embedding=rng.standard_normal(self.dim).astype(np.float32).tolist()))
+        return types.SimpleNamespace(data=data)
+
+
+class StubOpenAI:
+    """chat.completions.create (plain and stream=True) and embeddings.create."""
+
+    def __init__(self, latency=0.0, embedding_latency=0.0, dim=1536):
+        self.chat = types.SimpleNamespace(completions=_Completions(latency))
+        self.embeddings = _Embeddings(embedding_latency, dim)
+
+
+class StubIndex:
+    """In-memory Pinecone index: upsert() and brute-force cosine query()."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.vectors = {}
+
+    def upsert(self, vectors, namespace=""):
+        time.sleep(self.latency)
+        for v in vectors:
+            self.vectors[(namespace, v["id"])] = (np.asarray(v["values"], dtype=np.float32), v.get("metadata"))
+        return {"upserted_count": len(vectors)}
+
+    def query(self, vector, top_k=3, include_metadata=False, namespace=""):
+        time.sleep(self.latency)
+        items = [(vid, vec, md) for (ns, vid), (vec, md) in self.vectors.items() if ns == namespace]
+        if not items:
+            return {"matches": []}
+        q = np.asarray(vector, dtype=np.float32)
+        matrix = np.stack([vec for _, vec, _ in items])
+        scores = matrix @ q / (np.linalg.norm(matrix, axis=1) * (np.linalg.norm(q) or 1))
+        best = np.argsort(-scores)[:top_k]
+        return {"matches": [{"id": items[i][0], "score": float(scores[i]),
+                             "metadata": items[i][2] if include_metadata else None} for i in best]}
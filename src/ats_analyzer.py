@@ -1,10 +1,12 @@
 # src/ats_analyzer.py
+import os
 import re
 from collections import Counter
-from textblob import TextBlob
-from fuzzywuzzy import process
+from functools import lru_cache
 import logging
-from src.utils import extract_emails, extract_phones, contains_generic_phrases
+from src.utils import extract_emails, extract_phones, COMMON_GENERIC_PHRASES
+from src.skill_index import get_skill_index, load_skill_bank
+from src.readability import readability_stats
 
 LOG = logging.getLogger("ats_analyzer")
 
@@ -14,11 +16,155 @@ DEFAULT_SKILLS = [
     "machine learning","nlp","data analysis","excel","project management","sql","GitHub",
     "communication","leadership","problem solving","time management","teamwork","c++","c#","go","ruby","html","css","typescript","angular","vue.js","django","flask","spring","hibernate","rest api","graphql","linux","windows","azure","gcp","ci/cd","jenkins","terraform","ansible","puppet","salesforce","marketing","seo","content creation","social media management" 
 ]
+# optional curated taxonomy (one skill per line) replacing the built-in bank
+SKILLS_FILE = os.getenv("SKILLS_FILE")
+if SKILLS_FILE:
+    DEFAULT_SKILLS = load_skill_bank(SKILLS_FILE)
 
 COMMON_DEGREES = ["bachelor", "master", "phd", "b.sc", "m.sc", "b.s.", "m.s.", "mba"]
 
+
+EXPECTED_SECTIONS = ["experience", "education", "skills", "summary", "projects"]
+WEAK_VERBS = ["helped", "worked on", "responsible for", "assisted", "involved in"]
+
+# compiled once; every resume is scanned with these in a single pass
+KEYWORD_TOKEN_RE = re.compile(r'\b[a-zA-Z\+#\.\-]{2,}\b')
+YEAR_RE = re.compile(r'(\b(?:20|19)\d{2})')
+YEARS_PLUS_RE = re.compile(r'(\d+)\+?\s+years?')
+YEARS_RE = re.compile(r'(\d+)\s+years?')
+INSTITUTION_RE = re.compile(r'(university|college|institute|school|academy)[\s,\w\-]{0,60}', flags=re.I)
+LINKEDIN_RE = re.compile(r'(linkedin\.com\/[A-Za-z0-9\-_\/]+)', flags=re.I)
+BULLET_RE = re.compile(r'^\s*[\*\-\u2022]')
+ACHIEVEMENT_RE = re.compile(r'(\d+%|\$\d+|\d+\s+%|\bincreased\b|\breduced\b|\bsaved\b|\bgrew\b)')
+MAX_ACHIEVEMENTS = 20
+
+
+class ResumeFeatures:
+    """
+    All ATS features of one resume, computed in a single pass: the text is
+    lowercased and tokenized once and its lines are walked once.
+    The module-level helpers below are thin views over this object.
+    """
+
+    def __init__(self, resume_text):
+        text = resume_text or ""
+        lower = text.lower()
+        self.text = text
+        self.lower = lower
+
+        # tokens
+        self.words = set(KEYWORD_TOKEN_RE.findall(lower))
+
+        # lines: layout stats and achievement bullets in one walk
+        lines = text.splitlines()
+        total_len = 0
+        bullets = 0
+        achievements = []
+        for line, lline in zip(lines, lower.splitlines()):
+            total_len += len(line)
+            if BULLET_RE.match(line):
+                bullets += 1
+            if len(achievements) < MAX_ACHIEVEMENTS and ACHIEVEMENT_RE.search(lline):
+                achievements.append(line.strip())
+        self.avg_line_len = total_len / max(1, len(lines))
+        self.bullet_count = bullets
+        self.achievements = achievements
+        self.missing_sections = [s for s in EXPECTED_SECTIONS if s not in lower]
+
+        self.skills = self.skills_for(DEFAULT_SKILLS)
+        self.years = self._years(text, lower)
+        self.degrees = list(set(d for d in COMMON_DEGREES if d in lower))
+        self.institutions = INSTITUTION_RE.findall(text)[:5]
+        self.emails = extract_emails(text)
+        self.phones = extract_phones(text)
+        m = LINKEDIN_RE.search(text)
+        self.linkedin = m.group(1) if m else None
+        self.weak_verbs = [v for v in WEAK_VERBS if v in lower]
+        self.generic_phrases = [p for p in COMMON_GENERIC_PHRASES if p in lower]
+        self._readability = None
+
+    @staticmethod
+    def _years(text, lower):
+        # naive approach: span between earliest and latest year; fallback to experience phrases
+        years = 0
+        try:
+            years_in_text = list(map(int, YEAR_RE.findall(text)))
+            if len(years_in_text) >= 2:
+                years = max(years_in_text) - min(years_in_text)
+            elif years_in_text:
+                # look for explicit "X years"
+                m = YEARS_PLUS_RE.search(lower)
+                if m:
+                    years = int(m.group(1))
+        except Exception as e:
+            LOG.exception("years_of_experience error: %s", e)
+        # clamp
+        if years < 0:
+            years = 0
+        if years == 0:
+            # fallback heuristics
+            m = YEARS_RE.search(lower)
+            if m:
+                years = int(m.group(1))
+        return years
+
+    def skills_for(self, skills_bank):
+        # exact phrase automaton + n-gram pruned fuzzy matching, built once per skill bank
+        return get_skill_index(skills_bank).match(self.lower)
+
+    def keyword_match(self, job_keywords):
+        # job_keywords may be a keyword list or a JobProfile (which brings its own lookup set)
+        if hasattr(job_keywords, "keyword_match"):
+            return job_keywords.keyword_match(self.words)
+        matched = [k for k in job_keywords if k in self.words]
+        score = int(len(matched) / max(1, len(job_keywords)) * 100)
+        return score, matched, [k for k in job_keywords if k not in self.words]
+
+    def format_checks(self):
+        checks = []
+        # long one-line sections may indicate parsing issues
+        if self.avg_line_len > 200:
+            checks.append("Long lines detected — possible parsing issues or tables/images causing concatenation.")
+        if self.bullet_count < 3:
+            checks.append("Few bulleted achievements found. Consider using bullets for readability.")
+        if self.missing_sections:
+            checks.append(f"Missing common sections: {', '.join(self.missing_sections[:3])}.")
+        return checks
+
+    def readability(self):
+        # computed on first use only
+        if self._readability is None:
+            self._readability = readability_stats(self.text)
+        return dict(self._readability)
+
+    def report(self, job_keywords):
+        """Every ATS field the dashboard shows for one resume (job_keywords: list or JobProfile)."""
+        kw_score, matched_kws, missing_kws = self.keyword_match(job_keywords)
+        return {
+            "kw_score": kw_score,
+            "matched_kws": matched_kws,
+            "missing_kws": missing_kws,
+            "skills_found": list(self.skills),
+            "yrs": self.years,
+            "edu": {"degrees": list(self.degrees), "institutions": list(self.institutions)},
+            "format_checks": self.format_checks(),
+            "contact": {"emails": list(self.emails), "phones": list(self.phones), "linkedin": self.linkedin},
+            "readability": self.readability(),
+            "achievements": list(self.achievements),
+            "generic_phrases": list(self.generic_phrases),
+            "weak_verbs": list(self.weak_verbs),
+            "rel_score": relevance_score(kw_score, len(self.skills), len(self.achievements), self.years),
+        }
+
+
+@lru_cache(maxsize=32)
+def analyze_resume(resume_text):
+    """Return the ResumeFeatures for resume_text, reusing the last few analyses."""
+    return ResumeFeatures(resume_text)
+
+
 def extract_keywords_from_job(job_text, top_n=30):
-    words = re.findall(r'\b[a-zA-Z\+#\.\-]{2,}\b', job_text.lower())
+    words = KEYWORD_TOKEN_RE.findall(job_text.lower())
     stop = set(["the","and","with","for","using","in","to","of","a","an","as","on","by","or"])
     candidates = [w for w in words if w not in stop and not w.isdigit()]
     counts = Counter(candidates)
@@ -26,111 +172,35 @@ def extract_keywords_from_job(job_text, top_n=30):
     return [w for w,_ in counts.most_common(top_n)]
 
 def keyword_match_score(resume_text, job_keywords):
-    resume_words = set(re.findall(r'\b[a-zA-Z\+#\.\-]{2,}\b', resume_text.lower()))
-    matched = [k for k in job_keywords if k in resume_words]
-    score = int(len(matched) / max(1, len(job_keywords)) * 100)
-    return score, matched, [k for k in job_keywords if k not in matched]
+    return analyze_resume(resume_text).keyword_match(job_keywords)
 
 def extract_skills(resume_text, skills_bank=None):
-    skills_bank = skills_bank or DEFAULT_SKILLS
-    text = resume_text.lower()
-    found = set()
-    for sk in skills_bank:
-        if sk in text:
-            found.add(sk)
-    # fuzzy match for multiword skills
-    tokens = re.findall(r'\b[a-zA-Z\+\-\.]{2,}\b', text)
-    for sk in skills_bank:
-        choice, score = process.extractOne(sk, tokens)
-        if score > 90:
-            found.add(sk)
-    return sorted(list(found))
+    features = analyze_resume(resume_text)
+    if not skills_bank:
+        return list(features.skills)
+    return features.skills_for(skills_bank)
 
 def years_of_experience(resume_text):
-    # naive approach: find date ranges and sum durations; fallback to experience phrases
-    years = 0
-    dates = re.findall(r'(\b(?:20|19)\d{2})', resume_text)
-    try:
-        if dates:
-            years_in_text = list(map(int, dates))
-            if len(years_in_text) >= 2:
-                years = max(years_in_text) - min(years_in_text)
-            else:
-                # look for explicit "X years"
-                m = re.search(r'(\d+)\+?\s+years?', resume_text.lower())
-                if m:
-                    years = int(m.group(1))
-    except Exception as e:
-        LOG.exception("years_of_experience error: %s", e)
-    # clamp
-    if years < 0:
-        years = 0
-    if years == 0:
-        # fallback heuristics
-        m = re.search(r'(\d+)\s+years?', resume_text.lower())
-        if m:
-            years = int(m.group(1))
-    return years
+    return analyze_resume(resume_text).years
 
 def detect_education(resume_text):
-    lower = resume_text.lower()
-    found = []
-    for degree in COMMON_DEGREES:
-        if degree in lower:
-            found.append(degree)
-    # try capture universities
-    univ = re.findall(r'(university|college|institute|school|academy)[\s,\w\-]{0,60}', resume_text, flags=re.I)
-    return {"degrees": list(set(found)), "institutions": univ[:5]}
+    features = analyze_resume(resume_text)
+    return {"degrees": list(features.degrees), "institutions": list(features.institutions)}
 
 def format_structure_checks(resume_text, raw_pdf_bytes=None):
     # checks: many ATS break on images/tables; we can't detect images easily after text extraction; check for long lines, tables (many pipes), excessive columns
-    checks = []
-    # long one-line sections may indicate parsing issues
-    lines = resume_text.splitlines()
-    avg_line_len = sum(len(l) for l in lines) / max(1, len(lines))
-    if avg_line_len > 200:
-        checks.append("Long lines detected — possible parsing issues or tables/images causing concatenation.")
-    # detect bullets
-    bullets = sum(1 for l in lines if re.match(r'^\s*[\*\-\u2022]', l))
-    if bullets < 3:
-        checks.append("Few bulleted achievements found. Consider using bullets for readability.")
-    # detect header sections
-    expected_sections = ["experience","education","skills","summary","projects"]
-    missing = [s for s in expected_sections if s not in resume_text.lower()]
-    if missing:
-        checks.append(f"Missing common sections: {', '.join(missing[:3])}.")
-    return checks
+    return analyze_resume(resume_text).format_checks()
 
 def contact_info_checks(resume_text):
-    emails = extract_emails(resume_text)
-    phones = extract_phones(resume_text)
-    linkedin = None
-    m = re.search(r'(linkedin\.com\/[A-Za-z0-9\-_\/]+)', resume_text, flags=re.I)
-    if m:
-        linkedin = m.group(1)
-    return {"emails": emails, "phones": phones, "linkedin": linkedin}
+    features = analyze_resume(resume_text)
+    return {"emails": list(features.emails), "phones": list(features.phones), "linkedin": features.linkedin}
 
 def readability_scores(resume_text):
-    try:
-        blob = TextBlob(resume_text)
-        # TextBlob doesn't give Flesch; approximate with sentence/word measures
-        words = len(blob.words)
-        sentences = max(1, len(blob.sentences))
-        avg_words = words / sentences
-        # simple readability proxy: higher average words per sentence -> harder
-        fk_est = max(0, 206.835 - 1.015 * avg_words - 84.6 * (sum(len(w) for w in blob.words) / max(1, words))/words)
-    except Exception:
-        fk_est = None
-    return {"avg_words_per_sentence": avg_words, "flesch_estimate": int(fk_est) if fk_est else None}
+    return analyze_resume(resume_text).readability()
 
 def detect_achievements(resume_text):
-    # find lines with % or numbers + keywords like increased, reduced, saved, grew
-    lines = resume_text.splitlines()
-    achievements = []
-    for l in lines:
-        if re.search(r'(\d+%|\$\d+|\d+\s+%|\bincreased\b|\breduced\b|\bsaved\b|\bgrew\b)', l.lower()):
-            achievements.append(l.strip())
-    return achievements[:20]
+    # lines with % or numbers + keywords like increased, reduced, saved, grew
+    return list(analyze_resume(resume_text).achievements)
 
 def relevance_score(keyword_score, skills_count, achievements_count, years):
     # weighted combination -> 0..100
@@ -143,12 +213,7 @@ def relevance_score(keyword_score, skills_count, achievements_count, years):
     return score
 
 def detect_action_verb_weakness(resume_text):
-    weak_verbs = ["helped", "worked on", "responsible for", "assisted", "involved in"]
-    found = []
-    for v in weak_verbs:
-        if v in resume_text.lower():
-            found.append(v)
-    return found
+    return list(analyze_resume(resume_text).weak_verbs)
 
 def generic_phrase_detector(resume_text):
-    return contains_generic_phrases(resume_text)
+    return list(analyze_resume(resume_text).generic_phrases)
@@ -0,0 +1,116 @@
+# src/cache.py
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from src.config import CACHE_DIR
+
+LOG = logging.getLogger("cache")
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def make_key(*parts) -> str:
+    """Stable sha256 key for any JSON-serializable parts."""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    Local SQLite key/value store with TTL expiry, size-bounded LRU eviction
+    and hit/miss counters. Values are str or bytes. Safe to share between
+    threads; several processes may open the same file.
+    """
+
+    def __init__(self, path, ttl=None, max_entries=None):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB, expires REAL, accessed REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)")
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None or (row[1] is not None and row[1] < now):
+                if row is not None:
+                    self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.misses += 1
+                return default
+            self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires = now + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, expires, now)
+            )
+            if self.max_entries:
+                # least recently used entries go first once the cache is over its bound
+                self._conn.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed "
+                    "LIMIT max(0, (SELECT COUNT(*) FROM entries) - ?))",
+                    (self.max_entries,)
+                )
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def purge_expired(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE expires IS NOT NULL AND expires < ?", (time.time(),))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self),
+        }
+
+
+def get_cache(name, ttl=None, max_entries=None):
+    """Return the process-wide DiskCache stored as CACHE_DIR/<name>.sqlite."""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = DiskCache(os.path.join(CACHE_DIR, f"{name}.sqlite"), ttl=ttl, max_entries=max_entries)
+            _caches[name] = cache
+        return cache
+
+
+def all_caches():
+    """Every cache opened in this process, by name (for stats)."""
+    with _caches_lock:
+        return dict(_caches)
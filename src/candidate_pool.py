@@ -0,0 +1,298 @@
+# src/candidate_pool.py
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from src.config import CANDIDATES_DB
+from src.ats_analyzer import KEYWORD_TOKEN_RE, relevance_score
+from src.ranker import bm25, blend
+
+LOG = logging.getLogger("candidate_pool")
+
+SKILL_PREFIX = "skill:"
+MAX_BLOCKS = 8  # posting blocks per term before they are merged into one
+# report fields that describe the resume itself; keyword scores depend on the job and are recomputed
+STORED_FIELDS = ["skills_found", "yrs", "edu", "format_checks", "contact", "readability", "achievements",
+                 "generic_phrases", "weak_verbs"]
+
+
+def resume_terms(resume_text, skills=()):
+    """Term frequencies indexed for one resume: its keyword tokens (as jobs tokenize them) plus skill:<name>."""
+    terms = Counter(KEYWORD_TOKEN_RE.findall((resume_text or "").lower()))
+    for skill in skills:
+        terms[SKILL_PREFIX + skill.lower()] += 1
+    return terms
+
+
+class CandidatePool:
+    """
+    Every resume analyzed so far, kept in SQLite with its extracted text
+    and ATS features, plus an inverted index (term -> candidates, with term
+    frequencies) so a new job can be ranked against the whole pool without
+    reopening a PDF. Safe to share between threads.
+
+    Postings are append-only blocks of packed int32 arrays, one block per
+    term per insert batch, so reading a term is a few blob reads. Deleting
+    a candidate only removes its row; its stale postings are filtered
+    against the live ids and dropped when a term's blocks are merged.
+    """
+
+    def __init__(self, path=CANDIDATES_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS candidates ("
+            "id INTEGER PRIMARY KEY, digest TEXT UNIQUE, name TEXT, text BLOB, features TEXT, "
+            "n_terms INTEGER, n_skills INTEGER, n_achievements INTEGER, years INTEGER, added REAL);"
+            "CREATE TABLE IF NOT EXISTS terms (id INTEGER PRIMARY KEY, term TEXT UNIQUE);"
+            "CREATE TABLE IF NOT EXISTS postings (id INTEGER PRIMARY KEY, term INTEGER, ids BLOB, tfs BLOB);"
+            "CREATE INDEX IF NOT EXISTS postings_term ON postings(term);"
+        )
+        self._term_ids = dict(self._conn.execute("SELECT term, id FROM terms"))
+
+    def _term_id(self, term):
+        tid = self._term_ids.get(term)
+        if tid is None:
+            self._conn.execute("INSERT OR IGNORE INTO terms (term) VALUES (?)", (term,))
+            tid = self._conn.execute("SELECT id FROM terms WHERE term = ?", (term,)).fetchone()[0]
+            self._term_ids[term] = tid
+        return tid
+
+    def _lookup_term(self, term):
+        """Term id for reading, or None. Misses go to the database: another process may have added the term."""
+        tid = self._term_ids.get(term)
+        if tid is None:
+            with self._lock:
+                row = self._conn.execute("SELECT id FROM terms WHERE term = ?", (term,)).fetchone()
+            if row is not None:
+                tid = self._term_ids[term] = row[0]
+        return tid
+
+    def _delete(self, digest):
+        row = self._conn.execute("SELECT id FROM candidates WHERE digest = ?", (digest,)).fetchone()
+        if row is None:
+            return False
+        self._conn.execute("DELETE FROM candidates WHERE id = ?", (row[0],))
+        return True
+
+    def add_many(self, items):
+        """
+        Insert or replace candidates from (digest, name, resume_text, report)
+        tuples, where report is the ATS report of the resume. One transaction
+        per call; returns how many were stored.
+        """
+        now = time.time()
+        n = 0
+        blocks = {}  # term id -> ([candidate ids], [term frequencies])
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for digest, name, text, report in items:
+                    report = report or {}
+                    skills = report.get("skills_found") or []
+                    terms = resume_terms(text, skills)
+                    self._delete(digest)
+                    features = {k: report[k] for k in STORED_FIELDS if k in report}
+                    cur = self._conn.execute(
+                        "INSERT INTO candidates (digest, name, text, features, n_terms, n_skills, n_achievements, "
+                        "years, added) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (digest, name, zlib.compress((text or "").encode("utf-8"), 1), json.dumps(features),
+                         sum(terms.values()), len(skills), len(report.get("achievements") or []),
+                         int(report.get("yrs") or 0), now)
+                    )
+                    cid = cur.lastrowid
+                    for t, tf in terms.items():
+                        block = blocks.setdefault(self._term_id(t), ([], []))
+                        block[0].append(cid)
+                        block[1].append(tf)
+                    n += 1
+                self._conn.executemany(
+                    "INSERT INTO postings (term, ids, tfs) VALUES (?, ?, ?)",
+                    ((tid, np.array(ids, dtype=np.int32).tobytes(), np.array(tfs, dtype=np.int32).tobytes())
+                     for tid, (ids, tfs) in blocks.items())
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                # new term ids may have been rolled back with the transaction
+                self._term_ids = dict(self._conn.execute("SELECT term, id FROM terms"))
+                raise
+        return n
+
+    def add(self, digest, name, resume_text, report=None):
+        return self.add_many([(digest, name, resume_text, report)])
+
+    def remove(self, digest):
+        """Drop one candidate and its postings; False if it was not in the pool."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                removed = self._delete(digest)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return removed
+
+    def get(self, digest):
+        """The stored candidate (name, text, features) or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest, name, text, features, added FROM candidates WHERE digest = ?", (digest,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"digest": row[0], "name": row[1], "resume_text": zlib.decompress(row[2]).decode("utf-8"),
+                **json.loads(row[3]), "added": row[4]}
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def __contains__(self, digest):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM candidates WHERE digest = ?", (digest,)).fetchone() is not None
+
+    def _live_ids(self):
+        with self._lock:
+            return np.fromiter((r[0] for r in self._conn.execute("SELECT id FROM candidates ORDER BY id")),
+                               dtype=np.int64)
+
+    def postings(self, term, live=None):
+        """
+        (candidate ids, term frequencies) of one term as int32 arrays, which
+        may include deleted candidates. live (sorted ids of the current
+        candidates) is needed to merge a term with too many blocks.
+        """
+        tid = self._lookup_term(term)
+        if tid is None:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+        with self._lock:
+            rows = self._conn.execute("SELECT id, ids, tfs FROM postings WHERE term = ?", (tid,)).fetchall()
+        if not rows:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+        ids = np.concatenate([np.frombuffer(r[1], dtype=np.int32) for r in rows])
+        tfs = np.concatenate([np.frombuffer(r[2], dtype=np.int32) for r in rows])
+        if len(rows) > MAX_BLOCKS and live is not None:
+            keep = np.isin(ids, live)
+            ids, tfs = ids[keep], tfs[keep]
+            self._merge(tid, [r[0] for r in rows], ids, tfs)
+        return ids, tfs
+
+    def _merge(self, tid, block_ids, ids, tfs):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(f"DELETE FROM postings WHERE id IN ({','.join('?' * len(block_ids))})",
+                                   block_ids)
+                if len(ids):
+                    self._conn.execute("INSERT INTO postings (term, ids, tfs) VALUES (?, ?, ?)",
+                                       (tid, ids.tobytes(), tfs.tobytes()))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                LOG.exception("Could not merge posting blocks of term %s", tid)
+
+    def with_terms(self, terms):
+        """Digests of the candidates that have every one of terms (e.g. ["skill:python", "kafka"])."""
+        ids = self._live_ids()
+        live = ids
+        for term in terms:
+            found, _ = self.postings(term.lower(), live)
+            ids = np.intersect1d(ids, found)
+            if not len(ids):
+                return []
+        digests = []
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = [int(i) for i in ids[start:start + 500]]
+                digests += [r[0] for r in self._conn.execute(
+                    f"SELECT digest FROM candidates WHERE id IN ({','.join('?' * len(chunk))})", chunk)]
+        return digests
+
+    def rank(self, job, top_n=50):
+        """
+        Score every pooled candidate against job (a JobProfile) with the same
+        keyword match and relevance score as a fresh upload, plus BM25 with
+        pool-wide document frequencies, using only the inverted index and
+        the stored feature counts. Returns the top_n candidates, best first
+        by the blended rank_score, each with its stored features.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, n_skills, n_achievements, years, n_terms FROM candidates").fetchall()
+        if not rows:
+            return []
+        stats = np.array(rows, dtype=np.int64)
+        ids = stats[:, 0]
+        live = np.sort(ids)
+        row_of = np.full(int(ids.max()) + 1, -1, dtype=np.int64)
+        row_of[ids] = np.arange(len(ids))
+
+        # candidates x job keywords term frequencies, one posting list per keyword
+        keywords = list(job.keywords)
+        tf = np.zeros((len(ids), len(keywords)), dtype=np.float32)
+        for j, kw in enumerate(keywords):
+            found, tfs = self.postings(kw, live)
+            inside = found < len(row_of)
+            rows_found = row_of[found[inside]]
+            alive = rows_found >= 0
+            tf[rows_found[alive], j] = tfs[inside][alive]
+
+        hits = (tf > 0).sum(axis=1)
+        # same arithmetic as JobProfile.keyword_match: int(hits / n * 100)
+        kw_scores = (hits / max(1, len(keywords)) * 100).astype(np.int64)
+        rel = np.array([relevance_score(int(k), int(s), int(a), int(y))
+                        for k, s, a, y in zip(kw_scores, stats[:, 1], stats[:, 2], stats[:, 3])])
+        scores = bm25(tf, stats[:, 4].astype(np.float32))
+        combined = blend(scores, rel)
+        order = np.lexsort((-rel, -combined))[:top_n]
+
+        top_ids = [int(ids[r]) for r in order]
+        with self._lock:
+            details = {}
+            for start in range(0, len(top_ids), 500):
+                chunk = top_ids[start:start + 500]
+                details.update((r[0], r[1:]) for r in self._conn.execute(
+                    f"SELECT id, digest, name, features FROM candidates WHERE id IN ({','.join('?' * len(chunk))})",
+                    chunk))
+
+        results = []
+        for r, cid in zip(order, top_ids):
+            digest, name, features = details[cid]
+            results.append({
+                "digest": digest,
+                "name": name,
+                **json.loads(features),
+                "kw_score": int(kw_scores[r]),
+                "matched_kws": [k for j, k in enumerate(keywords) if tf[r, j] > 0],
+                "missing_kws": [k for j, k in enumerate(keywords) if tf[r, j] == 0],
+                "rel_score": int(rel[r]),
+                "bm25": round(float(scores[r]), 3),
+                "rank_score": round(float(combined[r]), 1),
+            })
+        return results
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_candidate_pool():
+    """The process-wide CandidatePool at CANDIDATES_DB, opened on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = CandidatePool()
+    return _pool
@@ -0,0 +1,413 @@
+# src/cli.py
+"""
+Batch screening from the command line, for resume sets too large for the web form.
+
+    python -m src.cli job.pdf resumes/ --out ranked.csv
+    python -m src.cli job.pdf resumes.zip --out ranked.jsonl --llm
+
+Resumes (every PDF in a folder, or in a zip archive) are parsed and
+ATS-scored across a process pool and each result is appended to --out
+(CSV or JSONL, by extension) as soon as it is ready. The output file is
+also the checkpoint: rerunning the same command skips every file already
+in it. When the run completes the file is rewritten ranked like the web
+analysis (BM25 over the batch blended with the ATS relevance score).
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import types
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from src.config import ATS_WORKERS, LLM_MAX_CONCURRENCY, MAX_UPLOAD_FILE_BYTES
+from src.utils import list_files_in_folder
+
+LOG = logging.getLogger("cli")
+
+PROGRESS_EVERY = 100
+POOL_BATCH = 200  # candidates per candidate-pool transaction
+
+CSV_FIELDS = ["rank", "file", "status", "rank_score", "rel_score", "bm25", "kw_score", "yrs", "skills_found",
+              "matched_kws", "missing_kws", "emails", "phones", "linkedin", "flesch_estimate", "achievements",
+              "fit_score", "quick_recommendation", "error", "digest", "keyword_tf", "doc_len"]
+
+
+def iter_resumes(source):
+    """(name, pdf bytes) for every PDF in a folder or zip archive, in name order."""
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as zf:
+            members = sorted(
+                (i for i in zf.infolist()
+                 if not i.is_dir() and i.filename.lower().endswith(".pdf") and not i.filename.startswith("__MACOSX/")),
+                key=lambda i: i.filename,
+            )
+            for info in members:
+                if info.file_size > MAX_UPLOAD_FILE_BYTES:
+                    yield info.filename, None
+                else:
+                    yield info.filename, zf.read(info)
+        return
+    for name in sorted(list_files_in_folder(source)):
+        if not name.lower().endswith(".pdf"):
+            continue
+        path = os.path.join(source, name)
+        if os.path.getsize(path) > MAX_UPLOAD_FILE_BYTES:
+            yield name, None
+            continue
+        with open(path, "rb") as fh:
+            yield name, fh.read()
+
+
+# set in each worker process by _init_worker, so the JobProfile is pickled once per worker
+_job = None
+
+
+def _init_worker(job):
+    global _job
+    _job = job
+
+
+def score_pdf(data):
+    """Parse one resume PDF and ATS-score it against the worker's job (runs in a worker process)."""
+    from src.resume_parser import extract_pdf
+    from src.ats_analyzer import ResumeFeatures
+    from src.ranker import term_matrix
+
+    extraction = extract_pdf(io.BytesIO(data))
+    text = extraction["text"]
+    # ResumeFeatures directly: analyze_resume's LRU cache would only pin memory in a batch run
+    report = ResumeFeatures(text).report(_job)
+    # per-keyword term counts, so the final ranking can run BM25 over the whole batch without the texts
+    tf, doc_len = term_matrix([text], _job.keywords)
+    return {"resume_text": text, **report, "keyword_tf": [int(n) for n in tf[0]], "doc_len": int(doc_len[0]),
+            "pdf": {k: extraction[k] for k in ("pages", "pages_read", "skipped")}}
+
+
+def _one_line(value):
+    if isinstance(value, (list, tuple)):
+        value = "; ".join(str(v) for v in value)
+    return " ".join(str(value).split()) if value is not None else ""
+
+
+def csv_row(record):
+    contact = record.get("contact") or {}
+    llm = record.get("llm_analysis") or {}
+    row = {
+        "rank": record.get("rank", ""),
+        "file": record["file"],
+        "status": record["status"],
+        "rank_score": record.get("rank_score", ""),
+        "rel_score": record.get("rel_score", ""),
+        "bm25": record.get("bm25", ""),
+        "kw_score": record.get("kw_score", ""),
+        "yrs": record.get("yrs", ""),
+        "skills_found": record.get("skills_found"),
+        "matched_kws": record.get("matched_kws"),
+        "missing_kws": (record.get("missing_kws") or [])[:10],
+        "emails": contact.get("emails"),
+        "phones": contact.get("phones"),
+        "linkedin": contact.get("linkedin"),
+        "flesch_estimate": (record.get("readability") or {}).get("flesch_estimate"),
+        "achievements": len(record.get("achievements") or []) if record["status"] == "ok" else "",
+        "fit_score": llm.get("fit_score") if isinstance(llm, dict) else None,
+        "quick_recommendation": llm.get("quick_recommendation") if isinstance(llm, dict) else None,
+        "error": record.get("error"),
+        "digest": record.get("digest"),
+        "keyword_tf": " ".join(str(n) for n in record.get("keyword_tf") or []),
+        "doc_len": record.get("doc_len", ""),
+    }
+    return {k: _one_line(v) for k, v in row.items()}
+
+
+def _number(value, default=0.0):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _keyword_tf(record, n_terms):
+    """A record's per-keyword term counts (a list in JSONL, space-separated in CSV), zeros if missing."""
+    tf = record.get("keyword_tf")
+    if isinstance(tf, str):
+        tf = tf.split()
+    tf = [_number(n) for n in tf or []]
+    return tf if len(tf) == n_terms else [0.0] * n_terms
+
+
+class ResultWriter:
+    """
+    Appends one record per resume to a CSV or JSONL file, flushed per
+    record. Reopening an existing file resumes it: a line torn by an
+    interrupted run is cut off and the names already present are skipped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.format = "csv" if path.lower().endswith(".csv") else "jsonl"
+        self.done = {}  # file name -> status
+        existed = os.path.exists(path) and os.path.getsize(path) > 0
+        if existed:
+            self._truncate_partial_line()
+            for record in self.read():
+                self.done[record["file"]] = record["status"]
+        self._fh = open(path, "a", encoding="utf-8", newline="")
+        self._csv = None
+        if self.format == "csv":
+            self._csv = csv.DictWriter(self._fh, fieldnames=CSV_FIELDS)
+            if not existed:
+                self._csv.writeheader()
+                self._fh.flush()
+
+    def _truncate_partial_line(self):
+        with open(self.path, "rb+") as fh:
+            data = fh.read()
+            if not data.endswith(b"\n"):
+                fh.truncate(data.rfind(b"\n") + 1)
+
+    def read(self):
+        with open(self.path, encoding="utf-8", newline="") as fh:
+            if self.format == "csv":
+                return list(csv.DictReader(fh))
+            return [json.loads(line) for line in fh if line.strip()]
+
+    def write(self, record):
+        if self._csv:
+            self._csv.writerow(csv_row(record))
+        else:
+            self._fh.write(json.dumps(record, default=str) + "\n")
+        self._fh.flush()
+        self.done[record["file"]] = record["status"]
+
+    def close(self):
+        self._fh.close()
+
+    def rank(self, job):
+        """
+        Rewrite the file ranked like the web analysis (src.ranker: BM25 over
+        the batch blended with the ATS score; no embeddings), failed files
+        last, with rank, rank_score and bm25 columns.
+        """
+        # a file re-scored with --retry-failed keeps only its latest record
+        from src.ranker import rank_scores
+
+        records = list({r["file"]: r for r in self.read()}.values())
+        ok = [r for r in records if r["status"] == "ok"]
+        if ok:
+            n_terms = len(job.keywords)
+            tf = np.array([_keyword_tf(r, n_terms) for r in ok], dtype=np.float32).reshape(len(ok), n_terms)
+            doc_len = np.array([_number(r.get("doc_len")) for r in ok], dtype=np.float32)
+            ats = np.array([_number(r.get("rel_score")) for r in ok], dtype=np.float32)
+            scores, combined = rank_scores(tf, doc_len, ats)
+            for r, s, c in zip(ok, scores, combined):
+                r["bm25"] = round(float(s), 3)
+                r["rank_score"] = round(float(c), 1)
+        records.sort(key=lambda r: (r["status"] != "ok", -_number(r.get("rank_score"), -1.0),
+                                    -_number(r.get("rel_score"), -1.0), r["file"]))
+        rank = 0
+        for record in records:
+            if record["status"] == "ok":
+                rank += 1
+                record["rank"] = rank
+            else:
+                record["rank"] = ""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".part")
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as out:
+            if self.format == "csv":
+                writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+                writer.writeheader()
+                writer.writerows({k: record.get(k, "") for k in CSV_FIELDS} for record in records)
+            else:
+                for record in records:
+                    out.write(json.dumps(record, default=str) + "\n")
+        os.replace(tmp_path, self.path)
+        return records
+
+
+def load_job(job_path):
+    """JobProfile of a job description PDF (stored and profiled like a web upload) or plain-text file."""
+    from src.job_profile import JobProfile, get_job_profile
+    from src.upload_store import save_upload
+
+    if not job_path.lower().endswith(".pdf"):
+        with open(job_path, encoding="utf-8") as fh:
+            return JobProfile.from_text(fh.read())
+    with open(job_path, "rb") as fh:
+        digest, _, saved_path = save_upload(types.SimpleNamespace(stream=fh))
+    return get_job_profile(digest, saved_path)
+
+
+def run_batch(job_path, source, out_path, workers=ATS_WORKERS, llm=False, retry_failed=False, limit=None,
+              add_to_pool=False):
+    """
+    Score every resume PDF in source (folder or zip) against the job and
+    write the results to out_path, skipping files already recorded there.
+    With add_to_pool the scored resumes are also stored in the candidate
+    pool. Returns the ranked records once all files are done.
+    """
+    job = load_job(job_path)
+    writer = ResultWriter(out_path)
+    skip = {name for name, status in writer.done.items() if status == "ok" or not retry_failed}
+    if skip:
+        LOG.info("Resuming: %d files already in %s", len(skip), out_path)
+
+    workers = max(1, workers)
+    window = workers * 4  # PDFs read ahead of the workers; bounds memory on huge batches
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(job,))
+    llm_pool = ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY, thread_name_prefix="llm") if llm else None
+    scoring = {}    # future -> (name, digest)
+    analyzing = {}  # future -> record
+    seen = {}       # digest -> record of the first copy scored in this run
+    counts = {"ok": 0, "failed": 0}
+    to_pool = []
+    start = time.perf_counter()
+
+    def flush_pool():
+        if to_pool:
+            from src.candidate_pool import get_candidate_pool
+            get_candidate_pool().add_many(to_pool)
+            to_pool.clear()
+
+    def finish(record):
+        text = record.pop("resume_text", None)
+        if add_to_pool and record["status"] == "ok" and text is not None:
+            to_pool.append((record["digest"], record["file"], text, record))
+            if len(to_pool) >= POOL_BATCH:
+                flush_pool()
+        writer.write(record)
+        counts[record["status"]] += 1
+        n = counts["ok"] + counts["failed"]
+        if n % PROGRESS_EVERY == 0:
+            LOG.info("%d resumes done (%d failed), %.1f/s", n, counts["failed"], n / (time.perf_counter() - start))
+
+    def scored(name, digest, result):
+        if "error" in result:
+            finish({"file": name, "digest": digest, "status": "failed", "error": result["error"]})
+            return
+        record = {"file": name, "digest": digest, "status": "ok", **result}
+        seen[digest] = record
+        if llm_pool:
+            analyzing[llm_pool.submit(_llm_analysis, record["resume_text"], job)] = record
+        else:
+            finish(record)
+
+    def drain(block):
+        nonlocal pool
+        pending = set(scoring) | set(analyzing)
+        if not pending:
+            return
+        finished, _ = wait(pending, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        broken = False
+        for fut in finished:
+            if fut in analyzing:
+                record = analyzing.pop(fut)
+                record["llm_analysis"] = fut.result()
+                finish(record)
+                continue
+            name, digest = scoring.pop(fut)
+            try:
+                result = fut.result()
+            except BrokenProcessPool:
+                # a worker died inside the PDF parser; files in flight with it are marked failed
+                broken = True
+                result = {"error": "worker process died"}
+            except Exception as e:
+                result = {"error": str(e) or e.__class__.__name__}
+            scored(name, digest, result)
+        if broken:
+            pool.shutdown(wait=False, cancel_futures=True)
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(job,))
+
+    try:
+        submitted = 0
+        for name, data in iter_resumes(source):
+            if name in skip:
+                continue
+            if limit is not None and submitted >= limit:
+                break
+            submitted += 1
+            if data is None:
+                finish({"file": name, "status": "failed", "error": "file too large"})
+                continue
+            digest = hashlib.sha256(data).hexdigest()
+            if digest in seen:
+                # identical file already scored in this run
+                finish({**seen[digest], "file": name})
+                continue
+            while len(scoring) + len(analyzing) >= window:
+                drain(block=True)
+            try:
+                scoring[pool.submit(score_pdf, data)] = (name, digest)
+            except BrokenProcessPool:
+                drain(block=True)
+                scoring[pool.submit(score_pdf, data)] = (name, digest)
+            drain(block=False)
+        while scoring or analyzing:
+            drain(block=True)
+    except KeyboardInterrupt:
+        LOG.warning("Interrupted after %d resumes; rerun the same command to continue.", sum(counts.values()))
+        raise
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        if llm_pool:
+            llm_pool.shutdown(wait=False, cancel_futures=True)
+        writer.close()
+        try:
+            # also on interrupt: these files are already in the output and will be skipped on rerun
+            flush_pool()
+        except Exception:
+            LOG.exception("Could not add resumes to the candidate pool.")
+
+    LOG.info("Scored %d resumes (%d failed) in %.1fs", sum(counts.values()), counts["failed"],
+             time.perf_counter() - start)
+    return writer.rank(job)
+
+
+def _llm_analysis(resume_text, job):
+    from src.llm_analyzer import analyze_resume_via_llm
+    try:
+        return analyze_resume_via_llm(resume_text, job)
+    except Exception:
+        LOG.exception("LLM analysis failed.")
+        return {"raw": "LLM analysis failed."}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m src.cli", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("job", help="job description: PDF or plain-text file")
+    ap.add_argument("resumes", help="folder of resume PDFs, or a zip archive of them")
+    ap.add_argument("--out", required=True, help="results file, .csv or .jsonl; also the checkpoint")
+    ap.add_argument("--workers", type=int, default=ATS_WORKERS, help="parsing/scoring processes")
+    ap.add_argument("--llm", action="store_true", help="also run the LLM analysis for every resume")
+    ap.add_argument("--pool", action="store_true", help="also add the scored resumes to the candidate pool")
+    ap.add_argument("--retry-failed", action="store_true", help="re-score files recorded as failed")
+    ap.add_argument("--limit", type=int, help="score at most this many new files")
+    ap.add_argument("--top", type=int, default=10, help="ranked resumes to print at the end")
+    args = ap.parse_args(argv)
+
+    if not os.path.exists(args.resumes):
+        ap.error(f"{args.resumes} does not exist")
+    try:
+        records = run_batch(args.job, args.resumes, args.out, workers=args.workers, llm=args.llm,
+                            retry_failed=args.retry_failed, limit=args.limit, add_to_pool=args.pool)
+    except KeyboardInterrupt:
+        return 130
+    for record in records[:args.top]:
+        if record["status"] == "ok":
+            print(f"{record['rank']:>5}  {record['rank_score']:>5}  {record['rel_score']:>3}  {record['file']}")
+    print(f"results: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,9 @@
 # src/config.py
 import os
 import logging
+import threading
+import time
 from dotenv import load_dotenv
-from openai import OpenAI
-from pinecone import Pinecone
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
@@ -15,26 +15,187 @@ PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "anas")
 
 EMBEDDING_MODEL = "text-embedding-3-small"
 EMBEDDING_DIM = 1536
+# inputs per embeddings request (API max 2048) and vectors per Pinecone upsert (recommended <= 100)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "100"))
+# embeddings are cached per (model, text hash): an in-memory LRU in front of an on-disk store
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "2048"))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "500000"))
 
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+# LLM calls: concurrency cap for batch analysis, per-call timeout (seconds), rate-limit retries
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+# resume bullets rewritten per completion by the bulk rewrite
+REWRITE_BATCH_SIZE = int(os.getenv("REWRITE_BATCH_SIZE", "10"))
+# token budgets: whole input of one LLM request, and the job description segment within it
+LLM_INPUT_TOKENS = int(os.getenv("LLM_INPUT_TOKENS", "2500"))
+JOB_PROMPT_TOKENS = int(os.getenv("JOB_PROMPT_TOKENS", "1000"))
+
+# uploaded PDFs are stored once per sha256 digest, with their extracted text alongside
+UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", "data/uploads")
+# upload limits: whole /analyze request and each file in it (files are streamed to disk, not held in memory)
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", str(50 * 1024 * 1024)))
+MAX_UPLOAD_FILE_BYTES = int(os.getenv("MAX_UPLOAD_FILE_BYTES", str(20 * 1024 * 1024)))
+
+# PDF text extraction: pages and characters read per document, per-page and per-document time budgets
+# (seconds), and processes for page-parallel extraction of long documents outside the scoring pool
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "12"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "30000"))
+PDF_PAGE_TIMEOUT = float(os.getenv("PDF_PAGE_TIMEOUT", "5"))
+PDF_DOC_TIMEOUT = float(os.getenv("PDF_DOC_TIMEOUT", "20"))
+PDF_PAGE_WORKERS = int(os.getenv("PDF_PAGE_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "6"))
+
+# worker processes for PDF parsing + ATS scoring of batch uploads
+ATS_WORKERS = int(os.getenv("ATS_WORKERS", str(os.cpu_count() or 1)))
+
+# background analysis jobs: SQLite job store, worker threads, seconds without progress before a running job is re-queued
+JOBS_DB = os.getenv("JOBS_DB", "data/jobs.sqlite")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "900"))
+# each server process heartbeats its running jobs; jobs of a process silent for 3 heartbeats are re-queued
+JOB_HEARTBEAT_SECONDS = int(os.getenv("JOB_HEARTBEAT_SECONDS", "15"))
+
+# ranking blend: BM25 keyword relevance, the ATS relevance score and job/resume embedding similarity
+RANK_BM25_WEIGHT = float(os.getenv("RANK_BM25_WEIGHT", "0.5"))
+RANK_ATS_WEIGHT = float(os.getenv("RANK_ATS_WEIGHT", "0.3"))
+RANK_EMBEDDING_WEIGHT = float(os.getenv("RANK_EMBEDDING_WEIGHT", "0.2"))
+
+# every analyzed resume is kept in a local candidate pool (text, ATS features, inverted keyword index)
+# so later jobs can be ranked against it without re-uploading
+CANDIDATES_DB = os.getenv("CANDIDATES_DB", "data/candidates.sqlite")
+CANDIDATE_POOL_ENABLED = os.getenv("CANDIDATE_POOL_ENABLED", "1") == "1"
+
+# LinkedIn profile fetches: only these hosts (and their subdomains) are fetched; profiles and their
+# analyses are cached per normalized URL, failures (LinkedIn blocks most fetches) for a shorter time
+LINKEDIN_HOSTS = [h.strip().lower() for h in os.getenv("LINKEDIN_HOSTS", "linkedin.com").split(",") if h.strip()]
+LINKEDIN_TIMEOUT = float(os.getenv("LINKEDIN_TIMEOUT", "10"))
+LINKEDIN_CACHE_TTL = int(os.getenv("LINKEDIN_CACHE_TTL", str(24 * 3600)))
+LINKEDIN_FAILURE_TTL = int(os.getenv("LINKEDIN_FAILURE_TTL", "600"))
+
+# per-request profiling: with PROFILING_ENABLED=1, /analyze?profile=1 writes a cProfile report to PROFILE_DIR
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "data/profiles")
+
+# local caches (SQLite files under CACHE_DIR)
+CACHE_DIR = os.getenv("CACHE_DIR", "data/cache")
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+JOB_PROFILE_CACHE_TTL = int(os.getenv("JOB_PROFILE_CACHE_TTL", str(30 * 24 * 3600)))
+
+# vector search backend: "pinecone" (default) or "local" (memory-mapped files under LOCAL_VECTOR_DIR)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone").lower()
+LOCAL_VECTOR_DIR = os.getenv("LOCAL_VECTOR_DIR", "data/vectors")
+LOCAL_VECTOR_ANN = os.getenv("LOCAL_VECTOR_ANN", "0") == "1"
+LOCAL_VECTOR_ANN_MIN_ROWS = int(os.getenv("LOCAL_VECTOR_ANN_MIN_ROWS", "50000"))
+LOCAL_VECTOR_NPROBE = int(os.getenv("LOCAL_VECTOR_NPROBE", "16"))
+
+# seconds before Pinecone index discovery (list_indexes) is repeated
+INDEX_REFRESH_SECONDS = int(os.getenv("INDEX_REFRESH_SECONDS", "300"))
 
-# initialize pinecone client but do not auto-create indexes to avoid quota issues
-pc = None
-index = None
 NAMESPACE = f"dim{EMBEDDING_DIM}"
 
-try:
-    if PINECONE_API_KEY:
-        pc = Pinecone(api_key=PINECONE_API_KEY)
-        index_list = [i["name"] for i in pc.list_indexes()]
-        if PINECONE_INDEX_NAME in index_list:
-            index = pc.Index(PINECONE_INDEX_NAME)
-            LOG.info("Using existing pinecone index '%s'", PINECONE_INDEX_NAME)
-        else:
-            LOG.warning("Pinecone index '%s' not found. Pinecone features disabled.", PINECONE_INDEX_NAME)
-            index = None
-    else:
-        LOG.warning("PINECONE_API_KEY not set. Pinecone features disabled.")
-except Exception as e:
-    LOG.exception("Pinecone initialization error: %s", e)
-    index = None
+# API clients and the index handle are created on first use (see get_openai_client /
+# get_index), so importing this module never touches the network
+_lock = threading.RLock()
+_openai_client = None
+_pc = None
+_index = None
+_index_checked = None
+
+
+def get_openai_client():
+    global _openai_client
+    if _openai_client is None:
+        with _lock:
+            if _openai_client is None:
+                from openai import OpenAI
+                _openai_client = OpenAI(api_key=OPENAI_API_KEY)
+    return _openai_client
+
+
+def get_pinecone():
+    global _pc
+    if _pc is None and PINECONE_API_KEY:
+        with _lock:
+            if _pc is None:
+                from pinecone import Pinecone
+                _pc = Pinecone(api_key=PINECONE_API_KEY)
+    return _pc
+
+
+def get_index():
+    """
+    The vector index handle, or None when vector search is not configured.
+    Pinecone discovery runs on first use and is repeated at most every
+    INDEX_REFRESH_SECONDS; a failed refresh keeps the last known handle.
+    """
+    global _index, _index_checked
+    if _index_checked is not None and time.monotonic() - _index_checked < INDEX_REFRESH_SECONDS:
+        return _index
+    with _lock:
+        if _index_checked is not None and time.monotonic() - _index_checked < INDEX_REFRESH_SECONDS:
+            return _index
+        if VECTOR_BACKEND == "local":
+            from src.vector_store import LocalVectorIndex
+            _index = LocalVectorIndex(LOCAL_VECTOR_DIR, EMBEDDING_DIM, ann=LOCAL_VECTOR_ANN,
+                                      ann_min_rows=LOCAL_VECTOR_ANN_MIN_ROWS, nprobe=LOCAL_VECTOR_NPROBE)
+            LOG.info("Using local vector index in '%s'", LOCAL_VECTOR_DIR)
+            _index_checked = float("inf")  # nothing to re-discover
+            return _index
+        # do not auto-create indexes to avoid quota issues
+        try:
+            pc = get_pinecone()
+            if pc is None:
+                LOG.warning("PINECONE_API_KEY not set. Pinecone features disabled.")
+                _index = None
+            else:
+                index_list = [i["name"] for i in pc.list_indexes()]
+                if PINECONE_INDEX_NAME in index_list:
+                    if _index is None:
+                        _index = pc.Index(PINECONE_INDEX_NAME)
+                        LOG.info("Using existing pinecone index '%s'", PINECONE_INDEX_NAME)
+                else:
+                    LOG.warning("Pinecone index '%s' not found. Pinecone features disabled.", PINECONE_INDEX_NAME)
+                    _index = None
+        except Exception as e:
+            LOG.exception("Pinecone initialization error: %s", e)
+        _index_checked = time.monotonic()
+        return _index
+
+
+def set_clients(openai_client=None, index=None):
+    """Install ready-made clients (e.g. offline stubs for benchmarks) instead of creating them."""
+    global _openai_client, _index, _index_checked
+    with _lock:
+        if openai_client is not None:
+            _openai_client = openai_client
+        if index is not None:
+            _index = index
+            _index_checked = float("inf")
+
+
+def warm_up():
+    """Create the clients and discover the index on a background thread, off the request path."""
+    def run():
+        try:
+            get_openai_client()
+            get_index()
+        except Exception:
+            LOG.exception("Client warm-up failed; clients will be created on first use.")
+    threading.Thread(target=run, name="config-warm-up", daemon=True).start()
+
+
+def __getattr__(name):
+    # compatibility with code that reads the clients as module attributes
+    if name == "openai_client":
+        return get_openai_client()
+    if name == "pc":
+        return get_pinecone()
+    if name == "index":
+        return get_index()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,21 +1,157 @@
 # src/embeddings.py
-from src.config import openai_client, index, EMBEDDING_MODEL, NAMESPACE
+from src.config import (
+    get_openai_client, get_index, EMBEDDING_MODEL, NAMESPACE, EMBEDDING_BATCH_SIZE,
+    UPSERT_BATCH_SIZE, EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_MAX_ENTRIES
+)
+from src import metrics
+from src.cache import get_cache, make_key
+from array import array
+from collections import OrderedDict
+import hashlib
 import logging
+import threading
 LOG = logging.getLogger("embeddings")
 
+
+class EmbeddingCache:
+    """
+    Embeddings keyed by model name and text hash: a bounded in-memory LRU in
+    front of a persistent store of packed float32 vectors, so each text is
+    embedded once per model.
+    """
+
+    def __init__(self, memory_size=EMBEDDING_CACHE_SIZE):
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text, model=EMBEDDING_MODEL):
+        return make_key("embedding", model, hashlib.sha256(text.encode("utf-8")).hexdigest())
+
+    def _disk(self):
+        return get_cache("embeddings", max_entries=EMBEDDING_CACHE_MAX_ENTRIES)
+
+    def _remember(self, key, vector):
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def get(self, text):
+        key = self.key(text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                return vector
+        try:
+            packed = self._disk().get(key)
+        except Exception:
+            LOG.exception("Embedding cache read failed.")
+            packed = None
+        if packed is None:
+            return None
+        vector = array("f")
+        vector.frombytes(packed)
+        vector = vector.tolist()
+        self._remember(key, vector)
+        return vector
+
+    def put(self, text, vector):
+        key = self.key(text)
+        self._remember(key, list(vector))
+        try:
+            self._disk().set(key, array("f", vector).tobytes())
+        except Exception:
+            LOG.exception("Embedding cache write failed.")
+
+
+embedding_cache = EmbeddingCache()
+
+
+def _chunks(seq, size):
+    for i in range(0, len(seq), max(1, size)):
+        yield seq[i:i + size]
+
+
 def get_embedding(text: str) -> list:
     if not text:
         return []
-    resp = openai_client.embeddings.create(model=EMBEDDING_MODEL, input=text)
-    return resp.data[0].embedding
+    return get_embeddings([text])[0]
 
-def store_embedding(id: str, text: str, metadata: dict):
-    if index is None:
+
+def get_embeddings(texts, client=None) -> list:
+    """
+    Embed many texts; vectors come back in input order. Cached texts are not
+    sent again, the rest go out in one request.
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+    vectors = [embedding_cache.get(t) for t in texts]
+    missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+    hits = sum(1 for v in vectors if v is not None)
+    metrics.inc("embedding_lookups_total", hits, result="cached")
+    metrics.inc("embedding_lookups_total", len(texts) - hits, result="embedded")
+    if missing:
+        client = client or get_openai_client()
+        with metrics.timed("embedding_request"):
+            resp = client.embeddings.create(model=EMBEDDING_MODEL, input=missing)
+        fresh = dict(zip(missing, (d.embedding for d in sorted(resp.data, key=lambda d: d.index))))
+        for t, v in fresh.items():
+            embedding_cache.put(t, v)
+        vectors = [v if v is not None else fresh[t] for t, v in zip(texts, vectors)]
+    return vectors
+
+
+def store_embeddings(items, client=None, vector_index=None):
+    """
+    Embed and upsert many (id, text, metadata) items: one embeddings request
+    per EMBEDDING_BATCH_SIZE inputs and one upsert per UPSERT_BATCH_SIZE vectors.
+    Returns {id: None} for stored items and {id: "error message"} for failures.
+    """
+    vector_index = vector_index if vector_index is not None else get_index()
+    items = [(str(i), text, metadata) for i, text, metadata in items]
+    if vector_index is None:
         LOG.warning("Pinecone index not initialized; skipping store.")
-        return
-    emb = get_embedding(text)
-    if not emb:
-        LOG.warning("Empty embedding for id=%s", id)
-        return
-    index.upsert(vectors=[{"id": str(id), "values": emb, "metadata": metadata}], namespace=NAMESPACE)
-    LOG.info("Upserted vector %s into namespace %s", id, NAMESPACE)
+        return {i: "vector index not configured" for i, _, _ in items}
+
+    status = {}
+    vectors = []
+    pending = []
+    for i, text, metadata in items:
+        if text:
+            pending.append((i, text, metadata))
+        else:
+            status[i] = "empty text"
+    for chunk in _chunks(pending, EMBEDDING_BATCH_SIZE):
+        try:
+            embs = get_embeddings([text for _, text, _ in chunk], client=client)
+        except Exception as e:
+            LOG.exception("Embedding request failed for %d items", len(chunk))
+            status.update((i, f"embedding failed: {e}") for i, _, _ in chunk)
+            continue
+        for (i, _, metadata), emb in zip(chunk, embs):
+            if emb:
+                vectors.append({"id": i, "values": emb, "metadata": metadata})
+            else:
+                status[i] = "empty embedding"
+
+    for chunk in _chunks(vectors, UPSERT_BATCH_SIZE):
+        try:
+            with metrics.timed("vector_upsert"):
+                vector_index.upsert(vectors=chunk, namespace=NAMESPACE)
+            status.update((v["id"], None) for v in chunk)
+        except Exception as e:
+            LOG.exception("Upsert failed for %d vectors", len(chunk))
+            status.update((v["id"], f"upsert failed: {e}") for v in chunk)
+    LOG.info("Upserted %d of %d vectors into namespace %s",
+             sum(1 for s in status.values() if s is None), len(items), NAMESPACE)
+    return status
+
+
+def store_embedding(id: str, text: str, metadata: dict):
+    """Single-item store_embeddings; returns the error message or None."""
+    return store_embeddings([(id, text, metadata)]).get(str(id))
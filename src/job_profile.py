@@ -0,0 +1,91 @@
+# src/job_profile.py
+import json
+import logging
+from functools import lru_cache
+
+from src.config import LLM_MODEL, JOB_PROMPT_TOKENS, JOB_PROFILE_CACHE_TTL
+from src.ats_analyzer import extract_keywords_from_job
+from src.cache import get_cache, make_key
+from src.tokens import trim_to_tokens
+from src.upload_store import extract_text_cached
+
+LOG = logging.getLogger("job_profile")
+
+JOB_KEYWORDS = 40
+PROFILE_VERSION = 1  # bump when the fields of JobProfile or how they are derived change
+
+
+def normalize_job_text(job_text: str) -> str:
+    """Collapse whitespace and drop blank and repeated lines (page headers/footers)."""
+    seen = set()
+    lines = []
+    for line in job_text.splitlines():
+        line = " ".join(line.split())
+        if line and line not in seen:
+            seen.add(line)
+            lines.append(line)
+    return "\n".join(lines)
+
+
+class JobProfile:
+    """
+    Everything resume screening needs from one job description, derived
+    once: the ranked keywords and their lookup set, the normalized
+    requirement text and the token-trimmed segment sent in LLM prompts.
+    Plain attributes only, so it pickles cheaply to the scoring workers.
+    """
+
+    def __init__(self, digest, text, keywords, prompt_segment):
+        self.digest = digest
+        self.text = text
+        self.keywords = list(keywords)
+        self.keyword_set = frozenset(self.keywords)
+        self.prompt_segment = prompt_segment
+
+    @classmethod
+    def from_text(cls, job_text, digest=None):
+        text = normalize_job_text(job_text or "")
+        return cls(digest, text, extract_keywords_from_job(job_text or "", top_n=JOB_KEYWORDS),
+                   trim_to_tokens(text, JOB_PROMPT_TOKENS))
+
+    def keyword_match(self, words):
+        """(score, matched, missing) for a resume's token set, keywords in rank order."""
+        hits = self.keyword_set & words
+        matched = [k for k in self.keywords if k in hits]
+        missing = [k for k in self.keywords if k not in hits]
+        return int(len(matched) / max(1, len(self.keywords)) * 100), matched, missing
+
+    def to_dict(self):
+        return {"digest": self.digest, "text": self.text, "keywords": self.keywords,
+                "prompt_segment": self.prompt_segment}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["digest"], data["text"], data["keywords"], data["prompt_segment"])
+
+
+def job_profile_cache():
+    return get_cache("job_profiles", ttl=JOB_PROFILE_CACHE_TTL)
+
+
+@lru_cache(maxsize=64)
+def get_job_profile(digest, job_path):
+    """
+    JobProfile of the stored job PDF with this digest. Kept in memory for
+    the most recent jobs and on disk for JOB_PROFILE_CACHE_TTL seconds, so a
+    requisition screened over several days is profiled once.
+    """
+    key = make_key("job_profile", PROFILE_VERSION, LLM_MODEL, JOB_PROMPT_TOKENS, digest)
+    try:
+        cached = job_profile_cache().get(key)
+    except Exception:
+        LOG.exception("Job profile cache read failed.")
+        cached = None
+    if cached is not None:
+        return JobProfile.from_dict(json.loads(cached))
+    profile = JobProfile.from_text(extract_text_cached(job_path), digest)
+    try:
+        job_profile_cache().set(key, json.dumps(profile.to_dict()))
+    except Exception:
+        LOG.exception("Job profile cache write failed.")
+    return profile
@@ -0,0 +1,264 @@
+# src/jobs.py
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import JOBS_DB, JOB_WORKERS, JOB_STALE_SECONDS, JOB_HEARTBEAT_SECONDS
+
+LOG = logging.getLogger("jobs")
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+# a worker process that missed this many heartbeats is presumed gone
+OWNER_TIMEOUT = 3 * JOB_HEARTBEAT_SECONDS
+
+
+class JobStore:
+    """
+    Analysis jobs persisted in SQLite: parameters, status, per-resume
+    progress and the finished result, so they survive a restart. A running
+    job records its owner (the worker process that claimed it); owners
+    heartbeat so jobs of a process that is gone can be re-queued.
+    """
+
+    def __init__(self, path=JOBS_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT, params TEXT, progress TEXT, result TEXT, error TEXT, "
+            "created REAL, updated REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status)")
+        if "owner" not in [r[1] for r in self._conn.execute("PRAGMA table_info(jobs)")]:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS owners (owner TEXT PRIMARY KEY, heartbeat REAL)")
+
+    def _execute(self, sql, args=()):
+        with self._lock:
+            return self._conn.execute(sql, args)
+
+    def create(self, params, progress):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (id, status, params, progress, created, updated) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, QUEUED, json.dumps(params), json.dumps(progress), now, now)
+        )
+        return job_id
+
+    def claim(self, job_id, owner=None):
+        """Mark a queued job as running for owner; False if another worker already has it."""
+        cur = self._execute(
+            "UPDATE jobs SET status = ?, owner = ?, updated = ? WHERE id = ? AND status = ?",
+            (RUNNING, owner, time.time(), job_id, QUEUED)
+        )
+        return cur.rowcount == 1
+
+    def heartbeat(self, owner):
+        self._execute("INSERT OR REPLACE INTO owners (owner, heartbeat) VALUES (?, ?)", (owner, time.time()))
+
+    def get(self, job_id, with_result=False):
+        cols = "id, status, params, progress, error, created, updated" + (", result" if with_result else "")
+        row = self._execute(f"SELECT {cols} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {
+            "id": row[0], "status": row[1], "params": json.loads(row[2]),
+            "progress": json.loads(row[3] or "{}"), "error": row[4], "created": row[5], "updated": row[6],
+        }
+        if with_result:
+            job["result"] = json.loads(row[7]) if row[7] else None
+        return job
+
+    def set_progress(self, job_id, progress):
+        self._execute("UPDATE jobs SET progress = ?, updated = ? WHERE id = ?",
+                      (json.dumps(progress), time.time(), job_id))
+
+    def finish(self, job_id, result, progress):
+        self._execute("UPDATE jobs SET status = ?, result = ?, progress = ?, updated = ? WHERE id = ?",
+                      (DONE, json.dumps(result, default=str), json.dumps(progress), time.time(), job_id))
+
+    def fail(self, job_id, error, progress):
+        self._execute("UPDATE jobs SET status = ?, error = ?, progress = ?, updated = ? WHERE id = ?",
+                      (FAILED, error, json.dumps(progress), time.time(), job_id))
+
+    def recoverable(self, stale_seconds=JOB_STALE_SECONDS, owner_timeout=OWNER_TIMEOUT):
+        """
+        Queued jobs, plus running jobs whose owner stopped heartbeating (e.g.
+        the server restarted) or, for jobs without an owner, that made no
+        progress for stale_seconds.
+        """
+        now = time.time()
+        self._execute(
+            "UPDATE jobs SET status = ?, owner = NULL WHERE status = ? AND ("
+            "(owner IS NULL AND updated < ?) OR "
+            "owner NOT IN (SELECT owner FROM owners WHERE heartbeat >= ?))",
+            (QUEUED, RUNNING, now - stale_seconds, now - owner_timeout)
+        )
+        self._execute("DELETE FROM owners WHERE heartbeat < ?", (now - max(stale_seconds, owner_timeout),))
+        return [r[0] for r in self._execute("SELECT id FROM jobs WHERE status = ? ORDER BY created", (QUEUED,))]
+
+
+class EventBroker:
+    """
+    In-process fan-out of job events to live subscribers (the SSE endpoint).
+    Each subscriber gets its own queue; events for jobs nobody watches are
+    dropped, since the store always holds the full progress.
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, job_id):
+        q = queue.Queue()
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append(q)
+        return q
+
+    def unsubscribe(self, job_id, q):
+        with self._lock:
+            subscribers = self._subscribers.get(job_id, [])
+            if q in subscribers:
+                subscribers.remove(q)
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
+
+    def publish(self, job_id, event, data):
+        with self._lock:
+            subscribers = list(self._subscribers.get(job_id, []))
+        for q in subscribers:
+            q.put((event, data))
+
+
+class JobProgress:
+    """
+    Progress sink handed to run_analysis; every update is written through to
+    the store and published to the job's live subscribers.
+    """
+
+    def __init__(self, store, job_id, progress, events=None):
+        self.store = store
+        self.job_id = job_id
+        self.data = progress
+        self.events = events
+        self._lock = threading.Lock()
+
+    def _save(self, event, payload):
+        self.store.set_progress(self.job_id, self.data)
+        if self.events:
+            self.events.publish(self.job_id, event, payload)
+
+    def stage(self, name):
+        with self._lock:
+            self.data["stage"] = name
+            self._save("stage", {"stage": name})
+
+    def resume(self, index, status, data=None):
+        """Record one resume's status; data (ATS scores, then the LLM analysis) is merged into its result."""
+        with self._lock:
+            entry = self.data["resumes"][index]
+            entry["status"] = status
+            if data:
+                entry.setdefault("result", {}).update(data)
+            self.data["done"] = sum(1 for r in self.data["resumes"] if r["status"] in ("analyzed", "failed"))
+            self._save("resume", {"index": index, "done": self.data["done"], "total": self.data["total"], **entry})
+
+
+def initial_progress(params):
+    return {
+        "stage": "queued",
+        "total": len(params["uploads"]),
+        "done": 0,
+        "resumes": [{"name": u["orig_name"], "status": "queued"} for u in params["uploads"]],
+    }
+
+
+class JobQueue:
+    """
+    Runs analysis jobs on a local background thread pool. Jobs are claimed
+    atomically in the store, so several server processes can share one
+    database without running a job twice. A monitor thread heartbeats this
+    process and periodically re-enqueues jobs whose owner is gone.
+    """
+
+    def __init__(self, runner, store=None, workers=JOB_WORKERS, heartbeat_seconds=JOB_HEARTBEAT_SECONDS):
+        self.runner = runner
+        self.store = store or JobStore()
+        self.events = EventBroker()
+        self.owner = uuid.uuid4().hex
+        self.heartbeat_seconds = heartbeat_seconds
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._pending = set()  # job ids submitted to the pool and not finished yet
+        self._pending_lock = threading.Lock()
+        self.store.heartbeat(self.owner)
+        self._stop = threading.Event()
+        threading.Thread(target=self._monitor, name="job-monitor", daemon=True).start()
+
+    def _enqueue(self, job_id):
+        with self._pending_lock:
+            if job_id in self._pending:
+                return False
+            self._pending.add(job_id)
+        self._pool.submit(self._run, job_id)
+        return True
+
+    def submit(self, params):
+        job_id = self.store.create(params, initial_progress(params))
+        self._enqueue(job_id)
+        return job_id
+
+    def recover(self):
+        """Re-enqueue jobs left queued or interrupted by a restart."""
+        recoverable = self.store.recoverable(owner_timeout=3 * self.heartbeat_seconds)
+        job_ids = [job_id for job_id in recoverable if self._enqueue(job_id)]
+        if job_ids:
+            LOG.info("Re-enqueued %d unfinished analysis jobs", len(job_ids))
+        return job_ids
+
+    def _monitor(self):
+        while not self._stop.wait(self.heartbeat_seconds):
+            try:
+                self.store.heartbeat(self.owner)
+                self.recover()
+            except Exception:
+                LOG.exception("Job monitor failed; retrying at the next heartbeat.")
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, job_id):
+        try:
+            self._run_claimed(job_id)
+        finally:
+            with self._pending_lock:
+                self._pending.discard(job_id)
+
+    def _run_claimed(self, job_id):
+        if not self.store.claim(job_id, self.owner):
+            return
+        job = self.store.get(job_id)
+        progress = JobProgress(self.store, job_id, job["progress"], self.events)
+        try:
+            result = self.runner(job["params"], progress)
+        except Exception as e:
+            LOG.exception("Analysis job %s failed", job_id)
+            error = str(e) or "Analysis failed."
+            progress.data["stage"] = "failed"
+            self.store.fail(job_id, error, progress.data)
+            self.events.publish(job_id, FAILED, {"error": error})
+            return
+        progress.data["stage"] = "done"
+        self.store.finish(job_id, result, progress.data)
+        self.events.publish(job_id, DONE, {})
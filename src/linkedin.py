@@ -0,0 +1,121 @@
+# src/linkedin.py
+import json
+import logging
+import re
+import threading
+from urllib.parse import urlsplit, urlunsplit
+
+from src.config import LINKEDIN_HOSTS, LINKEDIN_TIMEOUT, LINKEDIN_CACHE_TTL, LINKEDIN_FAILURE_TTL
+from src import metrics
+from src.cache import get_cache, make_key
+
+LOG = logging.getLogger("linkedin")
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+              "AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/115.0 Safari/537.36")
+CONNECT_TIMEOUT = 3.05
+POOL_SIZE = 8
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Process-wide requests.Session: keep-alive connections pooled across profile fetches."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests  # deferred so importing the app stays fast
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "en"})
+                _session = session
+    return _session
+
+
+def linkedin_cache():
+    return get_cache("linkedin", ttl=LINKEDIN_CACHE_TTL)
+
+
+def normalize_linkedin_url(url):
+    """
+    Canonical form of a profile URL, used as the cache key: https, one
+    linkedin.com host (country subdomains fold into www), lowercase path
+    without query, fragment or trailing slash. None when the host is not one
+    of LINKEDIN_HOSTS, so arbitrary URLs are never fetched.
+    """
+    url = (url or "").strip()
+    if not url:
+        return None
+    if "://" not in url:
+        url = "https://" + url
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if not any(host == h or host.endswith("." + h) for h in LINKEDIN_HOSTS):
+        return None
+    path = re.sub(r"/+", "/", parts.path).rstrip("/").lower() or "/"
+    if host == "linkedin.com" or host.endswith(".linkedin.com"):
+        return urlunsplit(("https", "www.linkedin.com", path, "", ""))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, "", ""))
+
+
+def parse_profile(html):
+    """Best-effort headline and about text of a public profile page."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    headline = ""
+    about_text = ""
+    h1 = soup.find("h1")
+    if h1:
+        headline = h1.get_text(separator=" ", strip=True)
+    # 'About' section might be in a <section id="about"> or class-based; try multiple
+    about = soup.find(lambda tag: tag.name in ["section", "div"] and "about" in (tag.get("id") or "").lower())
+    if about:
+        about_text = about.get_text(separator=" ", strip=True)
+    # fallback: gather long text blocks
+    if not about_text:
+        ps = soup.find_all("p")
+        long_ps = [p.get_text(strip=True) for p in ps if len(p.get_text(strip=True)) > 80]
+        about_text = "\n".join(long_ps[:3])
+    return {"headline": headline, "about": about_text}
+
+
+def fetch_linkedin_profile(url, session=None):
+    """
+    Headline and about text of the profile at url (already normalized), or
+    {"error": ...}. Profiles are cached for LINKEDIN_CACHE_TTL seconds and
+    failures (blocked, timed out) for LINKEDIN_FAILURE_TTL, so a URL that
+    LinkedIn refuses does not cost another timeout on every submission.
+    """
+    cache = linkedin_cache()
+    key = make_key("linkedin_profile", url)
+    cached = cache.get(key)
+    if cached is not None:
+        metrics.inc("linkedin_fetch_total", result="cached")
+        return json.loads(cached)
+
+    session = session or get_session()
+    try:
+        with metrics.timed("linkedin_fetch"):
+            r = session.get(url, timeout=(CONNECT_TIMEOUT, LINKEDIN_TIMEOUT))
+        if r.status_code != 200:
+            profile = {"error": f"LinkedIn returned status {r.status_code}. LinkedIn often blocks automated "
+                                f"fetches. Try pasting profile text instead."}
+        else:
+            profile = parse_profile(r.text)
+    except Exception as e:
+        LOG.warning("LinkedIn fetch failed for %s: %s", url, e)
+        profile = {"error": "LinkedIn fetch failed. LinkedIn often blocks scrapers; paste the profile text if possible."}
+
+    failed = "error" in profile
+    metrics.inc("linkedin_fetch_total", result="failed" if failed else "fetched")
+    try:
+        cache.set(key, json.dumps(profile), ttl=LINKEDIN_FAILURE_TTL if failed else None)
+    except Exception:
+        LOG.exception("LinkedIn cache write failed.")
+    return profile
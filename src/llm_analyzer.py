@@ -1,17 +1,128 @@
 # src/llm_analyzer.py
-from openai import OpenAI
-from src.config import openai_client
+from src.config import (
+    get_openai_client, LLM_MODEL, LLM_MAX_CONCURRENCY, LLM_TIMEOUT,
+    LLM_MAX_RETRIES, LLM_BACKOFF_BASE, LLM_CACHE_ENABLED, LLM_CACHE_TTL,
+    LLM_CACHE_MAX_ENTRIES, LLM_INPUT_TOKENS, JOB_PROMPT_TOKENS, REWRITE_BATCH_SIZE
+)
+from src import metrics
+from src.cache import get_cache, make_key
+from src.job_profile import JobProfile
+from src.linkedin import normalize_linkedin_url, fetch_linkedin_profile, linkedin_cache
+from src.tokens import count_chat_tokens, fit_resume, trim_to_tokens
 import textwrap
 import json
 import logging
-import requests
-from bs4 import BeautifulSoup
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 LOG = logging.getLogger("llm_analyzer")
 
+# bump a version whenever its prompt template changes so stale completions are not served
+PROMPT_VERSIONS = {
+    "resume_analysis": 3,
+    "achievement_rewrite": 2,
+    "full_rewrite": 2,
+    "linkedin_summary": 2,
+    "linkedin_profile": 1,
+}
 
-def analyze_resume_via_llm(resume_text: str, job_text: str):
-    prompt = textwrap.dedent(f"""
+
+def llm_cache():
+    return get_cache("llm", ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES)
+
+
+def _complete(system: str, prompt: str, max_tokens: int, client=None, timeout=None, cache_as=None):
+    """
+    Run one chat completion and return its text.
+    With cache_as (a PROMPT_VERSIONS name) the completion is served from / stored
+    in the local LLM cache, keyed on the prompt (which holds the truncated
+    inputs), the model and the prompt version.
+    """
+    input_tokens = count_chat_tokens(system, prompt)
+    name = cache_as or "other"
+    if not (cache_as and LLM_CACHE_ENABLED):
+        LOG.info("LLM request: %d input tokens", input_tokens)
+        metrics.inc("llm_requests_total", prompt=name, source="api")
+        return _create(system, prompt, max_tokens, client, timeout, name=name)
+    key = make_key(cache_as, PROMPT_VERSIONS[cache_as], LLM_MODEL, system, prompt, max_tokens)
+    try:
+        cached = llm_cache().get(key)
+    except Exception:
+        LOG.exception("LLM cache read failed; calling the API.")
+        cached = None
+    if cached is not None:
+        LOG.info("LLM %s: %d input tokens (served from cache)", cache_as, input_tokens)
+        metrics.inc("llm_requests_total", prompt=name, source="cache")
+        return cached
+    LOG.info("LLM %s: %d input tokens", cache_as, input_tokens)
+    metrics.inc("llm_requests_total", prompt=name, source="api")
+    text = _create(system, prompt, max_tokens, client, timeout, name=name)
+    if text is not None:
+        try:
+            llm_cache().set(key, text)
+        except Exception:
+            LOG.exception("LLM cache write failed.")
+    return text
+
+
+def _create(system, prompt, max_tokens, client=None, timeout=None, stream=False, name="other"):
+    # rate-limit errors are retried with exponential backoff and jitter
+    # (with stream=True only opening the stream is retried; the open Stream is returned)
+    from openai import RateLimitError
+    client = client or get_openai_client()
+    delay = LLM_BACKOFF_BASE
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            with metrics.timed("llm_call", prompt=name):
+                resp = client.chat.completions.create(
+                    model=LLM_MODEL,
+                    messages=[{"role": "system", "content": system},
+                              {"role": "user", "content": prompt}],
+                    max_tokens=max_tokens,
+                    timeout=timeout or LLM_TIMEOUT,
+                    **({"stream": True} if stream else {})
+                )
+            if stream:
+                return resp
+            usage = getattr(resp, "usage", None)
+            if usage is not None:
+                LOG.debug("LLM usage: %s prompt / %s completion tokens", usage.prompt_tokens, usage.completion_tokens)
+                metrics.inc("llm_tokens_total", usage.prompt_tokens or 0, prompt=name, kind="prompt")
+                metrics.inc("llm_tokens_total", usage.completion_tokens or 0, prompt=name, kind="completion")
+            return resp.choices[0].message.content
+        except RateLimitError:
+            metrics.inc("llm_rate_limited_total", prompt=name)
+            if attempt == LLM_MAX_RETRIES:
+                raise
+            wait = delay + random.uniform(0, delay)
+            LOG.warning("Rate limited by LLM API; retrying in %.1fs (attempt %d/%d)", wait, attempt + 1, LLM_MAX_RETRIES)
+            time.sleep(wait)
+            delay *= 2
+
+
+def job_prompt_segment(job_text, max_tokens=JOB_PROMPT_TOKENS):
+    """The job description as sent to the LLM: a JobProfile's trimmed segment, or the text cut to max_tokens."""
+    if isinstance(job_text, JobProfile):
+        return job_text.prompt_segment
+    return trim_to_tokens(job_text, max_tokens)
+
+
+def budgeted_prompt(system, template, resume_text, **fields):
+    """
+    Fill template's {resume} so the whole request stays within
+    LLM_INPUT_TOKENS: the system message, the template and the other fields
+    are counted first, and the resume gets the remaining tokens, most
+    relevant sections first.
+    """
+    fixed = template.format(resume="", **fields)
+    budget = max(0, LLM_INPUT_TOKENS - count_chat_tokens(system, fixed))
+    return template.format(resume=fit_resume(resume_text, budget), **fields)
+
+
+# the job description goes before the resume so every prompt for one job
+# shares a long identical prefix, which the provider can serve from its prompt cache
+RESUME_ANALYSIS_PROMPT = textwrap.dedent("""
     You are an expert HR analyst. Compare the resume to the job description.
 
     Return strictly valid JSON with keys:
@@ -22,21 +133,20 @@ def analyze_resume_via_llm(resume_text: str, job_text: str):
     - tone: one-word label (e.g., "leadership", "technical", "collaborative")
     - suggested_roles: array of {{"role": "Role Name", "confidence": percent_int}}
 
-    Resume:
-    {resume_text[:4000]}
-
     Job Description:
-    {job_text[:4000]}
+    {job}
+
+    Resume:
+    {resume}
 
     Return only JSON.
     """)
-    resp = openai_client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "system", "content": "You are an expert HR analyst."},
-                  {"role": "user", "content": prompt}],
-        max_tokens=800
-    )
-    text = resp.choices[0].message.content
+
+
+def analyze_resume_via_llm(resume_text: str, job_text, client=None, timeout=None):
+    system = "You are an expert HR analyst."
+    prompt = budgeted_prompt(system, RESUME_ANALYSIS_PROMPT, resume_text, job=job_prompt_segment(job_text))
+    text = _complete(system, prompt, 800, client=client, timeout=timeout, cache_as="resume_analysis")
     try:
         return json.loads(text)
     except Exception:
@@ -46,25 +156,153 @@ def analyze_resume_via_llm(resume_text: str, job_text: str):
         return {"raw": text}
 
 
-def rewrite_achievement(bullet_text: str, target_style="quantified"):
-    prompt = textwrap.dedent(f"""
-    Rewrite the following resume bullet to be more {target_style}, concise and achievement-focused.
+def analyze_resumes_via_llm(resume_texts, job_text, max_workers=None, timeout=None, client=None,
+                            on_result=None):
+    """
+    Run analyze_resume_via_llm for many resumes concurrently (at most
+    max_workers calls in flight). job_text may be a JobProfile. Results come
+    back in input order; a call that fails yields {"raw": "LLM analysis
+    failed."} instead of raising.
+    on_result(i, analysis) is called as each analysis arrives.
+    """
+    resume_texts = list(resume_texts)
+    if not resume_texts:
+        return []
+
+    def run(i):
+        try:
+            analysis = analyze_resume_via_llm(resume_texts[i], job_text, client=client, timeout=timeout)
+        except Exception:
+            LOG.exception("LLM analysis failed.")
+            analysis = {"raw": "LLM analysis failed."}
+        if on_result:
+            on_result(i, analysis)
+        return analysis
+
+    workers = max(1, min(max_workers or LLM_MAX_CONCURRENCY, len(resume_texts)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm") as pool:
+        return list(pool.map(run, range(len(resume_texts))))
+
+
+ACHIEVEMENT_REWRITE_PROMPT = textwrap.dedent("""
+    Rewrite each of the following resume bullets to be more {style}, concise and achievement-focused.
+
+    Bullets (JSON):
+    {bullets}
+
+    Return strictly valid JSON: {{"rewrites": [{{"id": <id>, "text": "rewritten bullet"}}, ...]}}
+    with exactly one entry per input id. Return only JSON.
+    """)
+REWRITE_TOKENS_PER_BULLET = 120
+
+BULLET_REWRITE_PROMPT = textwrap.dedent("""
+    Rewrite the following resume bullet to be more {style}, concise and achievement-focused.
     Return only the rewritten bullet as plain text.
 
     Bullet:
-    {bullet_text}
+    {bullet}
     """)
-    resp = openai_client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "system", "content": "You are a resume-writing expert."},
-                  {"role": "user", "content": prompt}],
-        max_tokens=150
+
+
+def _rewrite_batch(bullets, target_style, client=None):
+    """One completion for up to REWRITE_BATCH_SIZE bullets; returns {index: rewritten}."""
+    prompt = ACHIEVEMENT_REWRITE_PROMPT.format(
+        style=target_style,
+        bullets=json.dumps([{"id": i, "text": b} for i, b in enumerate(bullets)], ensure_ascii=False)
     )
-    return resp.choices[0].message.content.strip()
+    text = _complete("You are a resume-writing expert.", prompt, REWRITE_TOKENS_PER_BULLET * len(bullets) + 50,
+                     client=client)
+    try:
+        rewrites = json.loads(text)["rewrites"]
+        return {int(r["id"]): r["text"].strip() for r in rewrites
+                if isinstance(r.get("text"), str) and 0 <= int(r["id"]) < len(bullets)}
+    except Exception:
+        LOG.exception("Bulk rewrite returned malformed JSON.")
+        return {}
 
 
-def full_resume_rewrite(resume_text: str, job_text: str, tone="leadership"):
-    prompt = textwrap.dedent(f"""
+def rewrite_achievements(bullets, target_style="quantified", client=None):
+    """
+    Rewrite many resume bullets with as few completions as possible: unique
+    bullets not in the local cache are packed REWRITE_BATCH_SIZE to a
+    completion, batches run concurrently, and results are mapped back by
+    index. Returns one rewritten string per bullet, in input order, or None
+    where the rewrite failed.
+    """
+    bullets = list(bullets)
+    results = [None] * len(bullets)
+    keys = [make_key("achievement_rewrite", PROMPT_VERSIONS["achievement_rewrite"], LLM_MODEL, target_style, b)
+            for b in bullets]
+    missing = {}
+    for i, (bullet, key) in enumerate(zip(bullets, keys)):
+        cached = None
+        if LLM_CACHE_ENABLED:
+            try:
+                cached = llm_cache().get(key)
+            except Exception:
+                LOG.exception("LLM cache read failed; calling the API.")
+        if cached is not None:
+            results[i] = cached
+        else:
+            missing.setdefault(bullet, []).append(i)
+
+    todo = list(missing)
+    batches = [todo[s:s + REWRITE_BATCH_SIZE] for s in range(0, len(todo), REWRITE_BATCH_SIZE)]
+
+    def run(batch):
+        try:
+            return batch, _rewrite_batch(batch, target_style, client=client)
+        except Exception:
+            LOG.exception("Bulk rewrite failed for %d bullets.", len(batch))
+            return batch, {}
+
+    if batches:
+        workers = max(1, min(LLM_MAX_CONCURRENCY, len(batches)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rewrite") as pool:
+            for batch, rewritten in pool.map(run, batches):
+                for j, bullet in enumerate(batch):
+                    text = rewritten.get(j)
+                    if text is None:
+                        continue
+                    for i in missing[bullet]:
+                        results[i] = text
+                    if LLM_CACHE_ENABLED:
+                        try:
+                            llm_cache().set(keys[missing[bullet][0]], text)
+                        except Exception:
+                            LOG.exception("LLM cache write failed.")
+    LOG.info("Rewrote %d bullets (%d cached) in %d completions",
+             len(bullets), len(bullets) - sum(len(v) for v in missing.values()), len(batches))
+    return results
+
+
+def rewrite_achievement(bullet_text: str, target_style="quantified"):
+    """
+    Rewrite one bullet with the plain-text prompt, so any reply is usable.
+    Shares the per-bullet cache with rewrite_achievements.
+    """
+    key = make_key("achievement_rewrite", PROMPT_VERSIONS["achievement_rewrite"], LLM_MODEL, target_style,
+                   bullet_text)
+    if LLM_CACHE_ENABLED:
+        try:
+            cached = llm_cache().get(key)
+            if cached is not None:
+                return cached
+        except Exception:
+            LOG.exception("LLM cache read failed; calling the API.")
+    prompt = BULLET_REWRITE_PROMPT.format(style=target_style, bullet=bullet_text)
+    rewritten = _complete("You are a resume-writing expert.", prompt, REWRITE_TOKENS_PER_BULLET + 30).strip()
+    if not rewritten:
+        raise RuntimeError("rewrite failed")
+    if LLM_CACHE_ENABLED:
+        try:
+            llm_cache().set(key, rewritten)
+        except Exception:
+            LOG.exception("LLM cache write failed.")
+    return rewritten
+
+
+FULL_REWRITE_PROMPT = textwrap.dedent("""
     You are an expert resume writer. Rewrite the resume below to optimize for the job description provided.
     - Use measurable achievements where possible.
     - Use action verbs.
@@ -74,90 +312,129 @@ def full_resume_rewrite(resume_text: str, job_text: str, tone="leadership"):
     Tone: {tone}
 
     Job:
-    {job_text[:2000]}
+    {job}
 
     Resume:
-    {resume_text[:4000]}
+    {resume}
     """)
-    resp = openai_client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "system", "content": "You are an expert resume writer."},
-                  {"role": "user", "content": prompt}],
-        max_tokens=1200
-    )
-    return resp.choices[0].message.content
 
 
-def generate_linkedin_summary(resume_text: str):
-    prompt = textwrap.dedent(f"""
+FULL_REWRITE_SYSTEM = "You are an expert resume writer."
+FULL_REWRITE_MAX_TOKENS = 1200
+
+
+def _full_rewrite_prompt(resume_text, job_text, tone):
+    return budgeted_prompt(FULL_REWRITE_SYSTEM, FULL_REWRITE_PROMPT, resume_text, tone=tone,
+                           job=job_prompt_segment(job_text, JOB_PROMPT_TOKENS // 2))
+
+
+def full_resume_rewrite(resume_text: str, job_text: str, tone="leadership"):
+    prompt = _full_rewrite_prompt(resume_text, job_text, tone)
+    return _complete(FULL_REWRITE_SYSTEM, prompt, FULL_REWRITE_MAX_TOKENS, cache_as="full_rewrite")
+
+
+def stream_full_resume_rewrite(resume_text: str, job_text: str, tone="leadership", client=None):
+    """
+    full_resume_rewrite as a generator of text chunks, forwarded from the
+    streaming API as they arrive. Closing the generator (e.g. the client went
+    away) closes the upstream stream, so the completion stops. A finished
+    rewrite is cached and shared with full_resume_rewrite.
+    """
+    prompt = _full_rewrite_prompt(resume_text, job_text, tone)
+    key = make_key("full_rewrite", PROMPT_VERSIONS["full_rewrite"], LLM_MODEL, FULL_REWRITE_SYSTEM, prompt,
+                   FULL_REWRITE_MAX_TOKENS)
+    if LLM_CACHE_ENABLED:
+        try:
+            cached = llm_cache().get(key)
+        except Exception:
+            LOG.exception("LLM cache read failed; calling the API.")
+            cached = None
+        if cached is not None:
+            yield cached
+            return
+    LOG.info("LLM full_rewrite (streamed): %d input tokens", count_chat_tokens(FULL_REWRITE_SYSTEM, prompt))
+    metrics.inc("llm_requests_total", prompt="full_rewrite_stream", source="api")
+    stream = _create(FULL_REWRITE_SYSTEM, prompt, FULL_REWRITE_MAX_TOKENS, client=client, stream=True,
+                     name="full_rewrite_stream")
+    parts = []
+    finished = False
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+        finished = True
+    finally:
+        if not finished:
+            LOG.info("Streamed rewrite cancelled after %d chunks.", len(parts))
+        stream.close()
+    if LLM_CACHE_ENABLED and parts:
+        try:
+            llm_cache().set(key, "".join(parts))
+        except Exception:
+            LOG.exception("LLM cache write failed.")
+
+
+LINKEDIN_SUMMARY_PROMPT = textwrap.dedent("""
     Convert this resume into an optimized LinkedIn headline and summary (1-2 sentence headline, 3-4 short bullet summary lines).
     Return JSON: {{ "headline": "...", "summary_bullets": ["...", "..."] }}
     Resume:
-    {resume_text[:3000]}
+    {resume}
     """)
-    resp = openai_client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "system", "content": "You are an expert LinkedIn optimizer."},
-                  {"role": "user", "content": prompt}],
-        max_tokens=300
-    )
+
+
+def generate_linkedin_summary(resume_text: str):
+    system = "You are an expert LinkedIn optimizer."
+    prompt = budgeted_prompt(system, LINKEDIN_SUMMARY_PROMPT, resume_text)
+    text = _complete(system, prompt, 300, cache_as="linkedin_summary")
     try:
-        return json.loads(resp.choices[0].message.content)
+        return json.loads(text)
     except Exception:
-        return {"raw": resp.choices[0].message.content}
+        return {"raw": text}
+
+
+LINKEDIN_PROFILE_PROMPT = textwrap.dedent("""
+    You are an expert HR analyst. Review this LinkedIn profile info and return JSON:
+    - strengths: array of short strings
+    - missing_skills: array of short strings
+    - quick_recommendation: short string
+
+    Headline: {headline}
+    About: {about}
+    Return only JSON.
+    """)
 
 
-def analyze_linkedin_profile(linkedin_url: str):
+def analyze_linkedin_profile(linkedin_url: str, session=None):
     """
     Try to fetch a public LinkedIn profile page and extract basic text for LLM analysis.
     LinkedIn may block scraping; if so, this will return an error and user can paste profile text instead.
+    Analyses are cached per normalized URL; fetch failures are cached (briefly) by src.linkedin.
     """
+    url = normalize_linkedin_url(linkedin_url)
+    if url is None:
+        return {"error": "Not a LinkedIn profile URL."}
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                          "AppleWebKit/537.36 (KHTML, like Gecko) "
-                          "Chrome/115.0 Safari/537.36"
-        }
-        r = requests.get(linkedin_url, headers=headers, timeout=10)
-        if r.status_code != 200:
-            return {"error": f"LinkedIn returned status {r.status_code}. LinkedIn often blocks automated fetches. Try pasting profile text instead."}
-        soup = BeautifulSoup(r.text, "html.parser")
-        # Best-effort extracts
-        headline = ""
-        about_text = ""
-        h1 = soup.find("h1")
-        if h1:
-            headline = h1.get_text(separator=" ", strip=True)
-        # 'About' section might be in a <section id="about"> or class-based; try multiple
-        about = soup.find(lambda tag: tag.name in ["section", "div"] and "about" in (tag.get("id") or "").lower())
-        if about:
-            about_text = about.get_text(separator=" ", strip=True)
-        # fallback: gather long text blocks
-        if not about_text:
-            ps = soup.find_all("p")
-            long_ps = [p.get_text(strip=True) for p in ps if len(p.get_text(strip=True)) > 80]
-            about_text = "\n".join(long_ps[:3])
+        cache = linkedin_cache()
+        key = make_key("linkedin_analysis", PROMPT_VERSIONS["linkedin_profile"], LLM_MODEL, url)
+        cached = cache.get(key)
+        if cached is not None:
+            return json.loads(cached)
+        profile = fetch_linkedin_profile(url, session=session)
+        if "error" in profile:
+            return profile
         # ask LLM to analyze headline/about
-        prompt = textwrap.dedent(f"""
-        You are an expert HR analyst. Review this LinkedIn profile info and return JSON:
-        - strengths: array of short strings
-        - missing_skills: array of short strings
-        - quick_recommendation: short string
-
-        Headline: {headline}
-        About: {about_text}
-        Return only JSON.
-        """)
-        resp = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "system", "content": "You are an expert HR analyst."},
-                      {"role": "user", "content": prompt}],
-            max_tokens=400
-        )
+        prompt = LINKEDIN_PROFILE_PROMPT.format(headline=profile["headline"], about=profile["about"])
+        text = _complete("You are an expert HR analyst.", prompt, 400, cache_as="linkedin_profile")
         try:
-            return json.loads(resp.choices[0].message.content)
+            analysis = json.loads(text)
         except Exception:
-            return {"raw": resp.choices[0].message.content}
+            analysis = {"raw": text}
+        cache.set(key, json.dumps(analysis))
+        return analysis
     except Exception as e:
-        LOG.exception("LinkedIn fetch exception: %s", e)
+        LOG.exception("LinkedIn analysis exception: %s", e)
         return {"error": "LinkedIn fetch failed. LinkedIn often blocks scrapers; paste the profile text if possible."}
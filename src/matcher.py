@@ -1,19 +1,27 @@
 # src/matcher.py
+from src import metrics
 from src.embeddings import get_embedding
-from src.config import index, NAMESPACE
+from src.config import get_index, NAMESPACE
 import logging
 
 LOG = logging.getLogger("matcher")
 
-def find_best_match(query_text: str, top_k: int = 3):
+def find_best_match(query_text: str, top_k: int = 3, exclude_ids=()):
+    """Nearest stored vectors to query_text, up to top_k, leaving out exclude_ids (e.g. the query's own resume)."""
+    exclude_ids = set(exclude_ids)
+    index = get_index()
     if index is None:
         LOG.warning("Pinecone not configured; returning empty matches.")
         return {"matches": []}
     query_vector = get_embedding(query_text)
     if not query_vector:
         return {"matches": []}
-    res = index.query(vector=query_vector, top_k=top_k, include_metadata=True, namespace=NAMESPACE)
+    with metrics.timed("vector_query"):
+        res = index.query(vector=query_vector, top_k=top_k + len(exclude_ids), include_metadata=True,
+                          namespace=NAMESPACE)
     matches = []
     for m in res.get("matches", []) or []:
+        if m.get("id") in exclude_ids:
+            continue
         matches.append({"id": m.get("id"), "score": m.get("score") or m.get("distance"), "metadata": m.get("metadata")})
-    return {"matches": matches}
+    return {"matches": matches[:top_k]}
@@ -0,0 +1,119 @@
+# src/metrics.py
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+LOG = logging.getLogger("metrics")
+
+PREFIX = "resume_analyzer_"
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_lock = threading.Lock()
+_histograms = {}  # name -> {labels: [bucket counts..., sum, count]}
+_counters = {}    # name -> {labels: value}
+
+# every metric's type and HELP text, defined once here rather than at each call site
+METRICS = {
+    "stage_seconds": ("histogram", "Latency per pipeline stage."),
+    "stage_errors_total": ("counter", "Failed calls per stage."),
+    "http_request_seconds": ("histogram", "Request latency per endpoint."),
+    "llm_requests_total": ("counter", "LLM requests by prompt and source."),
+    "llm_tokens_total": ("counter", "LLM tokens reported by the API."),
+    "llm_rate_limited_total": ("counter", "LLM calls rejected with a rate-limit error."),
+    "embedding_lookups_total": ("counter", "Embedding lookups by result."),
+    "pdf_pages_skipped_total": ("counter", "PDF pages left out of extraction."),
+    "linkedin_fetch_total": ("counter", "LinkedIn profile fetches by result."),
+}
+
+
+def _labels(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def observe(name, seconds, **labels):
+    """Record one latency sample (seconds) in histogram `name` (see METRICS)."""
+    key = _labels(labels)
+    with _lock:
+        series = _histograms.setdefault(name, {}).get(key)
+        if series is None:
+            series = _histograms[name][key] = [0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                series[i] += 1
+        series[-2] += seconds
+        series[-1] += 1
+
+
+def inc(name, value=1, **labels):
+    """Add value to counter `name` (see METRICS)."""
+    key = _labels(labels)
+    with _lock:
+        series = _counters.setdefault(name, {})
+        series[key] = series.get(key, 0) + value
+
+
+@contextmanager
+def timed(stage, **labels):
+    """Time a block into the stage_seconds histogram; failures also count in stage_errors_total."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        inc("stage_errors_total", stage=stage, **labels)
+        raise
+    finally:
+        observe("stage_seconds", time.perf_counter() - start, stage=stage, **labels)
+
+
+def _fmt_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join('%s="%s"' % (k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs) + "}"
+
+
+def render():
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    from src.cache import all_caches  # deferred: src.cache imports config
+    lines = []
+    with _lock:
+        for name, series in sorted(_histograms.items()):
+            full = PREFIX + name
+            lines += [f"# HELP {full} {METRICS.get(name, ('', ''))[1]}", f"# TYPE {full} histogram"]
+            for key, values in sorted(series.items()):
+                for i, bound in enumerate(BUCKETS):
+                    lines.append(f"{full}_bucket{_fmt_labels(key, [('le', repr(bound))])} {values[i]}")
+                lines.append(f"{full}_bucket{_fmt_labels(key, [('le', '+Inf')])} {values[-1]}")
+                lines.append(f"{full}_sum{_fmt_labels(key)} {values[-2]:.6f}")
+                lines.append(f"{full}_count{_fmt_labels(key)} {values[-1]}")
+        for name, series in sorted(_counters.items()):
+            full = PREFIX + name
+            lines += [f"# HELP {full} {METRICS.get(name, ('', ''))[1]}", f"# TYPE {full} counter"]
+            for key, value in sorted(series.items()):
+                lines.append(f"{full}{_fmt_labels(key)} {value}")
+
+    caches = all_caches()
+    if caches:
+        stats = {}
+        for name, cache in caches.items():
+            try:
+                stats[name] = cache.stats()
+            except Exception:
+                LOG.exception("Could not read stats of cache %s", name)
+        for metric, field, kind, help in [
+            ("cache_hits_total", "hits", "counter", "Local cache hits since start."),
+            ("cache_misses_total", "misses", "counter", "Local cache misses since start."),
+            ("cache_hit_ratio", "hit_rate", "gauge", "Local cache hit rate since start."),
+            ("cache_entries", "entries", "gauge", "Entries currently stored per local cache."),
+        ]:
+            lines += [f"# HELP {PREFIX}{metric} {help}", f"# TYPE {PREFIX}{metric} {kind}"]
+            for name, s in sorted(stats.items()):
+                lines.append(f'{PREFIX}{metric}{{cache="{name}"}} {s[field]}')
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
@@ -0,0 +1,337 @@
+# src/pipeline.py
+import cProfile
+import logging
+import os
+import pstats
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from src import metrics
+from src.config import ATS_WORKERS, PROFILE_DIR, CANDIDATE_POOL_ENABLED, RANK_EMBEDDING_WEIGHT
+from src.ats_analyzer import analyze_resume
+from src.job_profile import get_job_profile
+from src.candidate_pool import get_candidate_pool
+from src.upload_store import extract_pdf_cached
+from src.llm_analyzer import analyze_resumes_via_llm, analyze_linkedin_profile
+from src.embeddings import store_embeddings, get_embeddings
+from src.ranker import rank_resumes
+from src.matcher import find_best_match
+
+LOG = logging.getLogger("pipeline")
+
+EMBED_TEXT_CHARS = 2000  # resume prefix that is embedded (stored and queried alike, so the cached vector is reused)
+
+_pool = None
+_pool_lock = threading.Lock()
+# LinkedIn fetch + analysis runs here, alongside the resumes of its submission
+_linkedin_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="linkedin")
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=ATS_WORKERS)
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def score_resume_file(saved_path, job, isolate=None):
+    """
+    Parse one stored resume PDF and compute its ATS report against job, a
+    JobProfile (runs in a worker process). Stage timings come back under
+    "_timings" for the parent process to record; pages the extraction
+    skipped are reported under "pdf". isolate is passed on to extract_pdf.
+    """
+    t0 = time.perf_counter()
+    extraction = extract_pdf_cached(saved_path, isolate=isolate)
+    resume_text = extraction["text"]
+    t1 = time.perf_counter()
+    features = analyze_resume(resume_text)
+    t2 = time.perf_counter()
+    features.readability()
+    t3 = time.perf_counter()
+    report = features.report(job)
+    t4 = time.perf_counter()
+    timings = {"pdf_extract": t1 - t0, "ats_features": t2 - t1, "readability": t3 - t2, "ats_report": t4 - t3}
+    pdf = {k: extraction[k] for k in ("pages", "pages_read", "skipped")}
+    return {"resume_text": resume_text, **report, "pdf": pdf, "_timings": timings}
+
+
+def _score_inline(saved_path, job, isolate=None):
+    try:
+        return score_resume_file(saved_path, job, isolate=isolate)
+    except Exception as e:
+        LOG.exception("Scoring failed for %s", saved_path)
+        return {"error": str(e) or e.__class__.__name__}
+
+
+def score_resumes(saved_paths, job, on_result=None, inline=False):
+    """
+    Parse and ATS-score many stored resumes across a process pool of
+    ATS_WORKERS processes, against job (a JobProfile or a keyword list). Returns one dict per path, in input order: the
+    ATS report plus "resume_text", or {"error": ...} when that file failed.
+    on_result(i, result) is called as each file finishes. With inline=True
+    everything runs in the calling thread instead; a single file may then
+    still be extracted in a child process (see extract_pdf), a batch is not.
+    """
+    saved_paths = list(saved_paths)
+    results = [None] * len(saved_paths)
+
+    def done(i, result):
+        for stage, seconds in result.pop("_timings", {}).items():
+            metrics.observe("stage_seconds", seconds, stage=stage)
+        for reason, pages in result.get("pdf", {}).get("skipped", {}).items():
+            metrics.inc("pdf_pages_skipped_total", len(pages), reason=reason)
+        results[i] = result
+        if on_result:
+            on_result(i, result)
+
+    def run_inline():
+        isolate = None if len(saved_paths) <= 1 else False
+        for i, p in enumerate(saved_paths):
+            done(i, _score_inline(p, job, isolate))
+        return results
+
+    if inline or len(saved_paths) <= 1 or ATS_WORKERS <= 1:
+        return run_inline()
+
+    try:
+        pool = _get_pool()
+        futures = {pool.submit(score_resume_file, p, job): i for i, p in enumerate(saved_paths)}
+    except BrokenProcessPool:
+        _reset_pool()
+        LOG.warning("Process pool unavailable; scoring resumes inline.")
+        return run_inline()
+
+    broken = False
+    for fut in as_completed(futures):
+        i = futures[fut]
+        try:
+            done(i, fut.result())
+        except BrokenProcessPool as e:
+            # a worker died (e.g. crashed inside the PDF parser); only unfinished files are lost
+            broken = True
+            LOG.error("Worker process died while scoring %s", saved_paths[i])
+            done(i, {"error": str(e) or "worker process died"})
+        except Exception as e:
+            LOG.exception("Scoring failed for %s", saved_paths[i])
+            done(i, {"error": str(e) or e.__class__.__name__})
+    if broken:
+        _reset_pool()
+    return results
+
+
+class NullProgress:
+    """Progress sink for run_analysis when nobody is watching."""
+
+    def stage(self, name):
+        pass
+
+    def resume(self, index, status, data=None):
+        pass
+
+
+def ats_summary(upload, result):
+    """The part of a scored resume that is streamed to the dashboard before the LLM analysis arrives."""
+    return {
+        "orig_name": upload["orig_name"],
+        "saved_name": upload["saved_name"],
+        "rel_score": result["rel_score"],
+        "kw_score": result["kw_score"],
+        "matched_kws": result["matched_kws"][:10],
+        "yrs": result["yrs"],
+    }
+
+
+class TimedProgress:
+    """Progress sink wrapper that records how long each stage took in the stage_seconds histogram."""
+
+    def __init__(self, progress):
+        self.progress = progress
+        self._stage = None
+        self._since = None
+
+    def stage(self, name):
+        now = time.perf_counter()
+        if self._stage:
+            metrics.observe("stage_seconds", now - self._since, stage=f"pipeline:{self._stage}")
+        self._stage, self._since = name, now
+        if name:
+            self.progress.stage(name)
+
+    def resume(self, index, status, data=None):
+        self.progress.resume(index, status, data)
+
+
+def run_analysis(params, progress=None):
+    """
+    The full analysis behind /analyze for one submission.
+
+    params holds job_path, job_digest, job_filename, job_saved_name,
+    job_title, linkedin_url, top_n and uploads (one dict per stored resume
+    with orig_name, saved_name, saved_path and digest). Stage changes and
+    per-resume status ("scored", "failed", "analyzed") are reported to
+    progress as soon as each resume gets there, with its ATS summary and
+    then its LLM analysis attached. Returns the result_dashboard.html
+    context: job_filename, job_saved_name, job_title, job_text, top_n,
+    all_results (ranked), similarity and linkedin_analysis.
+
+    With params["profile"] the run is profiled with cProfile and the report
+    is written to PROFILE_DIR; its file name is returned as "profile".
+    """
+    if params.get("profile"):
+        return _profiled(params, progress)
+    progress = TimedProgress(progress or NullProgress())
+    start = time.perf_counter()
+    try:
+        return _run_analysis(params, progress)
+    finally:
+        progress.stage(None)
+        metrics.observe("stage_seconds", time.perf_counter() - start, stage="pipeline:total")
+
+
+def _profiled(params, progress):
+    """
+    run_analysis under cProfile. Resumes are scored inline so parsing and
+    scoring show up in the profile; time in the LLM threads shows up as waiting.
+    """
+    profiler = cProfile.Profile()
+    params = dict(params, profile=False, inline_scoring=True)
+    result = profiler.runcall(run_analysis, params, progress)
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    name = time.strftime("analyze-%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:8]
+    profiler.dump_stats(os.path.join(PROFILE_DIR, name + ".prof"))
+    with open(os.path.join(PROFILE_DIR, name + ".txt"), "w", encoding="utf-8") as fh:
+        pstats.Stats(profiler, stream=fh).sort_stats("cumulative").print_stats(60)
+    LOG.info("Profile of analysis written to %s", os.path.join(PROFILE_DIR, name + ".txt"))
+    result["profile"] = name
+    return result
+
+
+def _rank_embeddings(all_results, job):
+    """
+    (job vector, resume vectors) for the similarity part of the ranking, or
+    (None, None). Resumes use the prefix stored above, so their vectors
+    come from the embedding cache.
+    """
+    if not RANK_EMBEDDING_WEIGHT:
+        return None, None
+    try:
+        vectors = get_embeddings([job.text[:EMBED_TEXT_CHARS] or " "] +
+                                 [r["resume_text"][:EMBED_TEXT_CHARS] or " " for r in all_results])
+        return vectors[0], vectors[1:]
+    except Exception:
+        LOG.exception("Embeddings for ranking unavailable; ranking on keywords and ATS score.")
+        return None, None
+
+
+def _run_analysis(params, progress):
+    progress = progress or NullProgress()
+    uploads = params["uploads"]
+
+    # the job description is profiled once per PDF digest and reused across submissions
+    progress.stage("parsing job description")
+    job_digest = params.get("job_digest") or os.path.splitext(os.path.basename(params["job_path"]))[0]
+    job = get_job_profile(job_digest, params["job_path"])
+
+    # LinkedIn analysis (best-effort) is network and LLM bound; start it now and collect it after the resumes
+    linkedin_future = None
+    if params.get("linkedin_url"):
+        linkedin_future = _linkedin_executor.submit(analyze_linkedin_profile, params["linkedin_url"])
+
+    # Parse + ATS-score all resumes across the process pool; failed files are skipped
+    def scored_one(i, result):
+        if "error" in result:
+            progress.resume(i, "failed", {"error": result["error"]})
+        else:
+            progress.resume(i, "scored", ats_summary(uploads[i], result))
+
+    progress.stage("scoring resumes")
+    scored = score_resumes([u["saved_path"] for u in uploads], job, on_result=scored_one,
+                           inline=params.get("inline_scoring", False))
+    all_results = []
+    positions = []
+    for i, (upload, result) in enumerate(zip(uploads, scored)):
+        if "error" in result:
+            LOG.warning("Skipping %s: %s", upload["orig_name"], result["error"])
+            continue
+        all_results.append({**upload, **result})
+        positions.append(i)
+    if not all_results:
+        raise ValueError("No valid resumes uploaded.")
+
+    # keep the parsed resumes in the candidate pool so later jobs can be ranked against them (best-effort)
+    if CANDIDATE_POOL_ENABLED:
+        try:
+            get_candidate_pool().add_many((r["digest"], r["orig_name"], r["resume_text"], r) for r in all_results)
+        except Exception:
+            LOG.exception("Could not add resumes to the candidate pool; continuing.")
+
+    # store embeddings best-effort, batched (re-uploads of the same file overwrite one vector)
+    progress.stage("storing embeddings")
+    try:
+        status = store_embeddings(
+            (r["digest"], (r["resume_text"][:EMBED_TEXT_CHARS] or " "), {"filename": r["orig_name"]})
+            for r in all_results
+        )
+        failed = {i: e for i, e in status.items() if e}
+        if failed:
+            LOG.warning("Embeddings not stored for %d of %d resumes: %s", len(failed), len(status), failed)
+    except Exception:
+        LOG.exception("Embedding store failed; continuing.")
+
+    # LLM analysis for all resumes concurrently (best-effort, may be non-JSON fallback)
+    progress.stage("running AI analysis")
+    llm_analyses = analyze_resumes_via_llm(
+        [r["resume_text"] for r in all_results], job,
+        on_result=lambda i, a: progress.resume(positions[i], "analyzed", {"llm_analysis": a})
+    )
+    for result, llm_analysis in zip(all_results, llm_analyses):
+        result["llm_analysis"] = llm_analysis
+
+    linkedin_analysis = None
+    if linkedin_future is not None:
+        if not linkedin_future.done():
+            progress.stage("analyzing LinkedIn profile")
+        try:
+            linkedin_analysis = linkedin_future.result()
+        except Exception as e:
+            LOG.exception("LinkedIn analysis error: %s", e)
+            linkedin_analysis = {"error": "LinkedIn fetch/analysis failed. Try pasting profile text."}
+
+    # BM25 + ATS score (+ embedding similarity) in one vectorized pass, best first
+    progress.stage("ranking")
+    all_results = rank_resumes(all_results, job, *_rank_embeddings(all_results, job))
+
+    # Determine how many to show/use: top_n between 1 and len(results)
+    top_n = max(1, min(len(all_results), params.get("top_n", 1)))
+
+    # Similarity search on best resume (top 1), without the vector just stored for it
+    try:
+        best = all_results[0]
+        similarity = find_best_match(best["resume_text"][:EMBED_TEXT_CHARS] or " ", top_k=5,
+                                     exclude_ids=[best["digest"]])
+    except Exception:
+        similarity = {"matches": []}
+
+    return {
+        "job_filename": params["job_filename"],
+        "job_saved_name": params["job_saved_name"],
+        "job_title": params.get("job_title"),
+        "job_text": job.text,
+        "top_n": top_n,
+        "all_results": all_results,
+        "similarity": similarity,
+        "linkedin_analysis": linkedin_analysis,
+    }
@@ -0,0 +1,106 @@
+# src/ranker.py
+import logging
+from collections import Counter
+
+import numpy as np
+
+from src.config import RANK_BM25_WEIGHT, RANK_ATS_WEIGHT, RANK_EMBEDDING_WEIGHT
+from src.ats_analyzer import KEYWORD_TOKEN_RE
+
+LOG = logging.getLogger("ranker")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def term_matrix(texts, terms):
+    """
+    (tf, doc_len): an N x K float32 matrix of how often each of terms occurs
+    in each text, tokenized like job keywords, and each text's token count.
+    """
+    column = {t: j for j, t in enumerate(terms)}
+    doc_len = np.zeros(len(texts), dtype=np.float32)
+    rows, cols, values = [], [], []
+    for i, text in enumerate(texts):
+        counts = Counter(KEYWORD_TOKEN_RE.findall((text or "").lower()))
+        doc_len[i] = sum(counts.values())
+        for t in counts.keys() & column.keys():
+            rows.append(i)
+            cols.append(column[t])
+            values.append(counts[t])
+    # only the job's terms are columns, so the matrix stays small and dense; one scatter fills it
+    tf = np.zeros((len(texts), len(terms)), dtype=np.float32)
+    tf[rows, cols] = values
+    return tf, doc_len
+
+
+def bm25(tf, doc_len, df=None, n_docs=None, k1=BM25_K1, b=BM25_B):
+    """
+    Okapi BM25 of every document (row of tf) for the query made of the term
+    columns, in one vectorized pass. Document frequencies default to those
+    of the batch itself; pass df/n_docs to use a larger collection's.
+    """
+    if not tf.size:
+        return np.zeros(tf.shape[0], dtype=np.float32)
+    if df is None:
+        df = (tf > 0).sum(axis=0)
+        n_docs = tf.shape[0]
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+    avg_len = float(doc_len.mean()) or 1.0
+    norm = k1 * (1 - b + b * doc_len / avg_len)
+    return (tf * (k1 + 1) / (tf + norm[:, None])) @ idf
+
+
+def cosine(query, vectors):
+    """Cosine similarity of query to each row of vectors."""
+    query = np.asarray(query, dtype=np.float32)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1) * (np.linalg.norm(query) or 1.0)
+    return vectors @ query / np.where(norms == 0, 1.0, norms)
+
+
+def blend(bm25_scores, ats_scores, similarity=None):
+    """
+    0..100 ranking score: BM25 scaled to the best document of the batch, the
+    ATS relevance score and, when available, embedding similarity, weighted
+    by RANK_*_WEIGHT (weights of missing signals are spread over the rest).
+    """
+    bm25_scores = np.asarray(bm25_scores, dtype=np.float32)
+    top = float(bm25_scores.max()) if bm25_scores.size else 0.0
+    signals = [(RANK_BM25_WEIGHT, bm25_scores / top if top > 0 else np.zeros_like(bm25_scores)),
+               (RANK_ATS_WEIGHT, np.asarray(ats_scores, dtype=np.float32) / 100)]
+    if similarity is not None:
+        signals.append((RANK_EMBEDDING_WEIGHT, np.clip(np.asarray(similarity, dtype=np.float32), 0, 1)))
+    total = sum(w for w, _ in signals) or 1.0
+    return sum(w * s for w, s in signals) / total * 100
+
+
+def rank_scores(tf, doc_len, ats_scores, similarity=None):
+    """(bm25, rank_score) arrays for a batch: BM25 over its term matrix, blended with the ATS scores."""
+    scores = bm25(tf, doc_len)
+    return scores, blend(scores, ats_scores, similarity)
+
+
+def rank_resumes(results, job, job_vector=None, resume_vectors=None):
+    """
+    results (scored resumes with resume_text and rel_score) sorted best
+    first for job (a JobProfile). Each gets "bm25" and "rank_score"; with
+    an embedding of the job and of every resume, cosine similarity is
+    blended in as well.
+    """
+    if not results:
+        return []
+    tf, doc_len = term_matrix([r["resume_text"] for r in results], job.keywords)
+    ats = np.array([r["rel_score"] for r in results], dtype=np.float32)
+    similarity = None
+    if job_vector and resume_vectors and len(resume_vectors) == len(results) and all(resume_vectors):
+        similarity = cosine(job_vector, resume_vectors)
+    scores, combined = rank_scores(tf, doc_len, ats, similarity)
+    for i, r in enumerate(results):
+        r["bm25"] = round(float(scores[i]), 3)
+        r["rank_score"] = round(float(combined[i]), 1)
+        if similarity is not None:
+            r["job_similarity"] = round(float(similarity[i]), 4)
+    # ties keep the ATS order, then upload order
+    order = np.lexsort((np.arange(len(results)), -ats, -combined))
+    return [results[i] for i in order]
@@ -0,0 +1,63 @@
+# src/readability.py
+import re
+from functools import lru_cache
+
+# words (with inner apostrophes), sentence terminators followed by whitespace, and line breaks
+TOKEN_RE = re.compile(r"[A-Za-z]+(?:['’][A-Za-z]+)*|[.!?]+(?=\s|$)|\n")
+VOWEL_GROUP_RE = re.compile(r"[aeiouy]+")
+SILENT_END_RE = re.compile(r"(?:[^laeiouy]es|[^laeiouydt]ed|[^laeiouy]e)$")
+
+
+@lru_cache(maxsize=65536)
+def count_syllables(word):
+    """Heuristic syllable count: vowel groups, minus a silent final e/es/ed ("-ted"/"-ded" stay voiced)."""
+    word = word.lower()
+    if len(word) <= 3:
+        return 1
+    word = SILENT_END_RE.sub("", word)
+    if word.startswith("y"):
+        word = word[1:]
+    return max(1, len(VOWEL_GROUP_RE.findall(word)))
+
+
+def readability_stats(text):
+    """
+    Flesch reading ease, Flesch-Kincaid grade and Gunning fog of text,
+    counted in a single scan. Resumes are mostly unpunctuated bullets, so a
+    line break also ends a sentence.
+    """
+    words = sentences = syllables = complex_words = 0
+    in_sentence = False
+    for m in TOKEN_RE.finditer(text or ""):
+        token = m.group()
+        if token[0].isalpha():
+            n = count_syllables(token)
+            words += 1
+            syllables += n
+            if n >= 3:
+                complex_words += 1
+            in_sentence = True
+        elif in_sentence:
+            sentences += 1
+            in_sentence = False
+    if in_sentence:
+        sentences += 1
+
+    if not words:
+        return {"words": 0, "sentences": 0, "avg_words_per_sentence": 0, "avg_syllables_per_word": 0,
+                "flesch_reading_ease": None, "flesch_kincaid_grade": None, "gunning_fog": None,
+                "flesch_estimate": None}
+    wps = words / sentences
+    spw = syllables / words
+    ease = 206.835 - 1.015 * wps - 84.6 * spw
+    return {
+        "words": words,
+        "sentences": sentences,
+        "avg_words_per_sentence": round(wps, 2),
+        "avg_syllables_per_word": round(spw, 2),
+        "flesch_reading_ease": round(ease, 1),
+        "flesch_kincaid_grade": round(0.39 * wps + 11.8 * spw - 15.59, 1),
+        "gunning_fog": round(0.4 * (wps + 100 * complex_words / words), 1),
+        # 0..100 integer kept for existing consumers
+        "flesch_estimate": int(min(100, max(0, ease))),
+    }
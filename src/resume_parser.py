@@ -1,15 +1,290 @@
 # src/resume_parser.py
-import pdfplumber
-from typing import IO
+import io
+import logging
+import multiprocessing
+import os
 import re
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import IO
 
-def extract_text_from_pdf(pdf_file: IO) -> str:
-    text = ""
+from src.config import (
+    PDF_MAX_PAGES, PDF_MAX_CHARS, PDF_PAGE_TIMEOUT, PDF_DOC_TIMEOUT, PDF_PAGE_WORKERS, PDF_PARALLEL_MIN_PAGES
+)
+
+LOG = logging.getLogger("resume_parser")
+
+# reasons a page is left out of the extracted text
+PAGE_LIMIT = "page limit"
+CHAR_LIMIT = "character limit"
+PAGE_TIME_LIMIT = "page time limit"
+DOC_TIME_LIMIT = "document time limit"
+PAGE_ERROR = "unreadable"
+# time allowed on top of the budgets for an isolated extraction process to start and report back
+ISOLATION_GRACE = 5.0
+
+
+class PageTimeout(Exception):
+    pass
+
+
+@contextmanager
+def _page_alarm(seconds):
+    """
+    Interrupt the block with PageTimeout after seconds; the yielded dict
+    has "fired" set once it did (pdfplumber may re-raise the interrupt as
+    its own exception). Signals only reach the main thread, so elsewhere
+    (e.g. analysis job threads) extract_pdf runs the pages in a child
+    process instead (see _extract_isolated).
+    """
+    state = {"fired": False}
+    if not seconds or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield state
+        return
+
+    def on_alarm(signum, frame):
+        state["fired"] = True
+        raise PageTimeout()
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield state
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _extract_pages(pdf, page_numbers, deadline, page_timeout, max_chars):
+    """
+    Text of the given pages of an open pdfplumber document, in order, until
+    deadline (time.time()) or max_chars. Returns ({page: text}, {page: reason skipped}).
+    """
+    texts, skipped = {}, {}
+    chars = 0
+    for k, n in enumerate(page_numbers):
+        if chars >= max_chars:
+            skipped.update((m, CHAR_LIMIT) for m in page_numbers[k:])
+            break
+        if deadline and time.time() > deadline:
+            skipped.update((m, DOC_TIME_LIMIT) for m in page_numbers[k:])
+            break
+        page = pdf.pages[n]
+        alarm = {"fired": False}
+        try:
+            with _page_alarm(page_timeout) as alarm:
+                texts[n] = page.extract_text() or ""
+            chars += len(texts[n])
+        except Exception:
+            if alarm["fired"]:
+                skipped[n] = PAGE_TIME_LIMIT
+            else:
+                LOG.warning("Could not extract page %d", n + 1, exc_info=True)
+                skipped[n] = PAGE_ERROR
+        finally:
+            page.close()  # drop the page's parsed objects; long documents otherwise keep every page in memory
+    return texts, skipped
+
+
+def _extract_range(source, page_numbers, deadline, page_timeout, max_chars):
+    """_extract_pages for a slice of a PDF, given as a path or bytes (runs in a worker process)."""
+    import pdfplumber
+    with pdfplumber.open(io.BytesIO(source) if isinstance(source, bytes) else source) as pdf:
+        return _extract_pages(pdf, page_numbers, deadline, page_timeout, max_chars)
+
+
+def _isolated_worker(conn, source, page_numbers, deadline, page_timeout, max_chars):
+    try:
+        conn.send(_extract_range(source, page_numbers, deadline, page_timeout, max_chars))
+    except Exception:
+        LOG.warning("Could not extract PDF", exc_info=True)
+        conn.send(({}, {n: PAGE_ERROR for n in page_numbers}))
+    finally:
+        conn.close()
+
+
+def _extract_isolated(source, page_numbers, deadline, page_timeout, max_chars):
+    """
+    _extract_pages in a child process of its own, for callers off the main
+    thread where page alarms cannot fire. The child runs the pages on its
+    main thread, so the page budget holds; if it still overruns the
+    document budget (one page stuck in native code) it is killed and the
+    pages count as over the document time limit.
+    """
+    ctx = multiprocessing.get_context()
+    reader, writer = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_isolated_worker, args=(writer, source, page_numbers, deadline, page_timeout, max_chars),
+                       name="pdf-extract", daemon=True)
+    proc.start()
+    writer.close()
+    budget = deadline - time.time() if deadline else len(page_numbers) * page_timeout
+    try:
+        if reader.poll(max(0.0, budget) + page_timeout + ISOLATION_GRACE):
+            return reader.recv()
+        LOG.warning("PDF extraction overran its time budget; worker killed.")
+        return {}, {n: DOC_TIME_LIMIT for n in page_numbers}
+    except EOFError:
+        LOG.warning("PDF extraction worker died (exit code %s).", proc.exitcode)
+        return {}, {n: PAGE_ERROR for n in page_numbers}
+    finally:
+        if proc.is_alive():
+            proc.kill()
+        proc.join(1)
+        reader.close()
+
+
+_page_pool = None
+_page_pool_lock = threading.Lock()
+
+
+def _get_page_pool():
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = ProcessPoolExecutor(max_workers=PDF_PAGE_WORKERS)
+        return _page_pool
+
+
+def _reset_page_pool():
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is not None:
+            _page_pool.shutdown(wait=False, cancel_futures=True)
+        _page_pool = None
+
+
+def _extract_parallel(path, page_numbers, deadline, page_timeout, max_chars):
+    """Contiguous page ranges of a stored PDF across the page pool; ranges unfinished at deadline are skipped."""
+    n_chunks = min(PDF_PAGE_WORKERS, len(page_numbers))
+    size = -(-len(page_numbers) // n_chunks)
+    chunks = [page_numbers[i:i + size] for i in range(0, len(page_numbers), size)]
+    pool = _get_page_pool()
+    futures = {pool.submit(_extract_range, path, chunk, deadline, page_timeout, max_chars): chunk for chunk in chunks}
+    done, _ = wait(futures, timeout=max(0.0, deadline - time.time()) if deadline else None)
+    texts, skipped = {}, {}
+    for fut, chunk in futures.items():
+        if fut not in done:
+            # still running: the worker stops on its own at the deadline
+            fut.cancel()
+            skipped.update((n, DOC_TIME_LIMIT) for n in chunk)
+            continue
+        try:
+            chunk_texts, chunk_skipped = fut.result()
+        except BrokenProcessPool:
+            _reset_page_pool()
+            raise
+        except Exception:
+            LOG.warning("Could not extract pages %d-%d", chunk[0] + 1, chunk[-1] + 1, exc_info=True)
+            chunk_texts, chunk_skipped = {}, {n: PAGE_ERROR for n in chunk}
+        texts.update(chunk_texts)
+        skipped.update(chunk_skipped)
+    return texts, skipped
+
+
+def extract_pdf(pdf_file, max_pages=PDF_MAX_PAGES, max_chars=PDF_MAX_CHARS, page_timeout=PDF_PAGE_TIMEOUT,
+                doc_timeout=PDF_DOC_TIMEOUT, isolate=None) -> dict:
+    """
+    Text of a PDF (a path or a binary file object) within page, character
+    and time budgets: at most max_pages pages, no further pages once
+    max_chars characters were read, page_timeout seconds per page and
+    doc_timeout for the document. Long documents given as a path are split
+    across PDF_PAGE_WORKERS processes, unless this already is a worker
+    process. Called off the main thread (where the page alarm cannot fire)
+    the pages are read in a child process under a hard timeout, unless
+    isolate=False (callers working through a batch, where a process per
+    file costs more than the page limit saves; doc_timeout still applies
+    between pages). Returns
+    {"text", "pages" (total), "pages_read", "skipped" ({reason: [1-based
+    page numbers]}), "truncated"}.
+    """
+    import pdfplumber  # deferred so importing the app stays fast
+    deadline = time.time() + doc_timeout if doc_timeout else None
+    is_path = isinstance(pdf_file, (str, os.PathLike))
+    isolate = (isolate is not False and bool(page_timeout)
+               and threading.current_thread() is not threading.main_thread()
+               and multiprocessing.parent_process() is None)
+    source = os.fspath(pdf_file) if is_path else None
+    if isolate and not is_path:
+        source = pdf_file.read()
+        pdf_file = io.BytesIO(source)
     with pdfplumber.open(pdf_file) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
+        n_pages = len(pdf.pages)
+        page_numbers = list(range(min(n_pages, max_pages)))
+        parallel = (is_path and PDF_PAGE_WORKERS > 1
+                    and len(page_numbers) >= PDF_PARALLEL_MIN_PAGES and multiprocessing.parent_process() is None)
+        texts = None
+        if parallel:
+            try:
+                texts, skipped = _extract_parallel(source, page_numbers, deadline, page_timeout, max_chars)
+            except BrokenProcessPool:
+                LOG.warning("Page worker pool unavailable; extracting %s serially.", pdf_file)
+        if texts is None and isolate and page_numbers:
+            texts, skipped = _extract_isolated(source, page_numbers, deadline, page_timeout, max_chars)
+        if texts is None:
+            texts, skipped = _extract_pages(pdf, page_numbers, deadline, page_timeout, max_chars)
+
+    # pages come back in order; the character limit applies to the document as a whole
+    parts = []
+    chars = 0
+    for n in page_numbers:
+        if n not in texts:
+            continue
+        if chars >= max_chars:
+            skipped[n] = CHAR_LIMIT
+            continue
+        if texts[n]:
+            parts.append(texts[n])
+            chars += len(texts[n])
+    skipped.update((n, PAGE_LIMIT) for n in range(len(page_numbers), n_pages))
+
+    by_reason = {}
+    for n in sorted(skipped):
+        by_reason.setdefault(skipped[n], []).append(n + 1)
+    if by_reason:
+        LOG.info("PDF %s: skipped pages %s", pdf_file if isinstance(pdf_file, str) else "upload", by_reason)
     # Normalize whitespace
-    text = re.sub(r'\n{2,}', '\n\n', text)
-    return text.strip()
+    text = re.sub(r'\n{2,}', '\n\n', "\n".join(parts))
+    return {
+        "text": text.strip(),
+        "pages": n_pages,
+        "pages_read": len(page_numbers) - sum(1 for n in skipped if n < len(page_numbers)),
+        "skipped": by_reason,
+        "truncated": bool(by_reason),
+    }
+
+
+def extract_text_from_pdf(pdf_file: IO) -> str:
+    return extract_pdf(pdf_file)["text"]
+
+
+# common resume headings, by the section they start
+SECTION_HEADINGS = {
+    "summary": ["summary", "professional summary", "profile", "objective", "career objective", "about me"],
+    "experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "technologies"],
+    "projects": ["projects", "key projects", "personal projects"],
+    "education": ["education", "academic background", "education and training"],
+    "certifications": ["certifications", "certificates", "licenses and certifications", "courses"],
+    "awards": ["awards", "honors", "achievements", "accomplishments"],
+}
+HEADING_LOOKUP = {h: name for name, headings in SECTION_HEADINGS.items() for h in headings}
+HEADING_STRIP_RE = re.compile(r'[^a-z& ]+')
+
+def split_sections(text: str):
+    """
+    Split resume text at its section headings. Returns (section, text) pairs in
+    document order; whatever precedes the first heading (name, contact) is "header".
+    """
+    sections = [["header", []]]
+    for line in text.splitlines():
+        heading = HEADING_STRIP_RE.sub("", line.lower()).replace("&", "and").strip()
+        name = HEADING_LOOKUP.get(" ".join(heading.split()))
+        if name and len(line) < 60:
+            sections.append([name, []])
+        sections[-1][1].append(line)
+    return [(name, "\n".join(lines).strip()) for name, lines in sections if "".join(lines).strip()]
@@ -0,0 +1,173 @@
+# src/skill_index.py
+import math
+import re
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
+from itertools import chain
+
+# skills and resume text are tokenized the same way so phrases line up token by token
+TOKEN_RE = re.compile(r'\.?[a-z0-9][a-z0-9\+#\.\-/]*')
+# compound tokens ("python/django", "react.js", "aws-certified") are also matched part by part
+SUB_TOKEN_RE = re.compile(r'[/\-.]')
+NGRAM = 3
+# fuzzy matches must score above this (0-100, same scale as fuzzywuzzy.fuzz.ratio)
+FUZZY_THRESHOLD = 90
+# strings this short can only clear the threshold by being identical
+MIN_FUZZY_LEN = 5
+# fraction of a window's n-grams a skill must share before it is scored
+MIN_SHARED_GRAMS = 0.5
+
+
+def tokenize(text):
+    tokens = []
+    for t in TOKEN_RE.findall(text.lower()):
+        t = t.rstrip(".-/")
+        if t:
+            tokens.append(t)
+    return tokens
+
+
+def split_tokens(tokens):
+    """tokens with every compound token replaced by its parts; the same list when there is none."""
+    split = []
+    for t in tokens:
+        parts = [p for p in SUB_TOKEN_RE.split(t) if p]
+        if len(parts) > 1:
+            split.extend(parts)
+        else:
+            split.append(t)
+    return split if len(split) != len(tokens) else tokens
+
+
+def _grams(s):
+    padded = f"  {s} "
+    return set(padded[i:i + NGRAM] for i in range(len(padded) - NGRAM + 1))
+
+
+def load_skill_bank(path):
+    """Read a skill taxonomy file: one skill per line, '#' starts a comment."""
+    skills = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                skills.append(line)
+    return skills
+
+
+class SkillIndex:
+    """
+    Compiled matcher for a skill taxonomy. Built once per process; lookups
+    scale with the length of the resume, not the size of the taxonomy.
+
+    Stage 1 is an exact token-trie automaton over every skill phrase.
+    Stage 2 is a fuzzy pass: each resume token window pulls candidate skills
+    from a character n-gram inverted index (length-bucketed, prefix-filtered
+    on the rarest grams), and only those candidates are scored with
+    SequenceMatcher.
+    """
+
+    def __init__(self, skills, threshold=FUZZY_THRESHOLD):
+        self.skills = list(dict.fromkeys(skills))
+        self.threshold = threshold
+        self._trie = {}
+        self._names = []
+        self._gram_sets = []
+        self._gram_freq = Counter()
+        # (gram, length of skill name) -> skill ids, so the length filter is a bucket lookup
+        self._postings = defaultdict(list)
+        self.max_tokens = 1
+        for sid, skill in enumerate(self.skills):
+            tokens = tokenize(skill)
+            name = " ".join(tokens)
+            self._names.append(name)
+            self._gram_sets.append(_grams(name))
+            if not tokens:
+                continue
+            self.max_tokens = max(self.max_tokens, len(tokens))
+            node = self._trie
+            for t in tokens:
+                node = node.setdefault(t, {})
+            node.setdefault(None, []).append(sid)
+            if len(name) >= MIN_FUZZY_LEN:
+                for g in self._gram_sets[sid]:
+                    self._postings[(g, len(name))].append(sid)
+                    self._gram_freq[g] += 1
+
+    def __len__(self):
+        return len(self.skills)
+
+    def _exact(self, tokens):
+        found = set()
+        trie = self._trie
+        for i in range(len(tokens)):
+            node = trie
+            for t in tokens[i:i + self.max_tokens]:
+                node = node.get(t)
+                if node is None:
+                    break
+                found.update(node.get(None, ()))
+        return found
+
+    def _fuzzy(self, streams, found):
+        ratio = self.threshold / 100.0
+        windows = set()
+        for tokens in streams:
+            for n in range(1, self.max_tokens + 1):
+                for i in range(len(tokens) - n + 1):
+                    windows.add(" ".join(tokens[i:i + n]))
+        for w in windows:
+            lw = len(w)
+            if lw < MIN_FUZZY_LEN:
+                continue
+            # two strings can only reach `ratio` if their lengths are close enough
+            lengths = range(math.ceil(lw * ratio / (2 - ratio)), int(lw * (2 - ratio) / ratio) + 1)
+            # near-identical strings share most of their n-grams; anything below half is pruned
+            grams = _grams(w)
+            need = max(1, math.ceil(len(grams) * MIN_SHARED_GRAMS))
+            # prefix filter: a candidate sharing `need` grams must hold one of the rarest
+            # len(grams) - need + 1 of them, so only those posting lists are read
+            prefix = sorted(grams, key=lambda g: self._gram_freq.get(g, 0))[:len(grams) - need + 1]
+            postings = self._postings
+            pool = set(chain.from_iterable(
+                postings[key] for key in ((g, n) for g in prefix for n in lengths) if key in postings
+            ))
+            pool.difference_update(found)
+            candidates = [sid for sid in pool if len(self._gram_sets[sid] & grams) >= need]
+            if not candidates:
+                continue
+            sm = SequenceMatcher(None, "", w)
+            for sid in candidates:
+                sm.set_seq1(self._names[sid])
+                if sm.quick_ratio() * 100 > self.threshold and round(sm.ratio() * 100) > self.threshold:
+                    found.add(sid)
+
+    def match(self, text):
+        """
+        Return the sorted skills found in text (exact phrase or close fuzzy
+        match). Compound tokens match whole ("ci/cd", "node.js") and by
+        their parts ("python/django" finds python and django).
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+        streams = [tokens]
+        split = split_tokens(tokens)
+        if split is not tokens:
+            streams.append(split)
+        found = set()
+        for stream in streams:
+            found |= self._exact(stream)
+        self._fuzzy(streams, found)
+        return sorted(self.skills[sid] for sid in found)
+
+
+@lru_cache(maxsize=8)
+def _cached_index(skills):
+    return SkillIndex(skills)
+
+
+def get_skill_index(skills):
+    """Return the process-wide SkillIndex for this skill bank, building it on first use."""
+    return _cached_index(tuple(skills))
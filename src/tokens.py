@@ -0,0 +1,86 @@
+# src/tokens.py
+import logging
+from functools import lru_cache
+
+from src.config import LLM_MODEL
+from src.resume_parser import split_sections
+
+LOG = logging.getLogger("tokens")
+
+CHARS_PER_TOKEN = 4  # rough estimate used when no tokenizer is available
+CHAT_OVERHEAD_TOKENS = 9  # per request with a system and a user message: 3 per message + 3 to prime the reply
+
+# resume sections in the order they are given prompt budget: small, dense sections
+# first, then experience takes what is left; unlisted sections come last
+SECTION_PRIORITY = ["skills", "summary", "experience", "projects", "education", "certifications", "awards", "header"]
+MIN_SECTION_TOKENS = 40  # a section is not included at all if less than this is left for it
+
+
+@lru_cache(maxsize=4)
+def get_encoding(model=LLM_MODEL):
+    """tiktoken encoding for model, or None if tiktoken or its BPE files are unavailable (e.g. offline)."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        LOG.warning("No tiktoken encoding for %s; estimating token counts from text length.", model)
+        return None
+
+
+def count_tokens(text: str, model=LLM_MODEL) -> int:
+    enc = get_encoding(model)
+    if enc is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def trim_to_tokens(text: str, max_tokens: int, model=LLM_MODEL) -> str:
+    """Longest prefix of text that fits in max_tokens."""
+    enc = get_encoding(model)
+    if enc is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = enc.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return enc.decode(tokens[:max_tokens])
+
+
+def count_chat_tokens(system: str, prompt: str, model=LLM_MODEL) -> int:
+    """Input tokens of a chat request with one system and one user message."""
+    return count_tokens(system, model) + count_tokens(prompt, model) + CHAT_OVERHEAD_TOKENS
+
+
+def fit_resume(resume_text: str, max_tokens: int, model=LLM_MODEL) -> str:
+    """
+    The most relevant part of a resume that fits in max_tokens. Sections are
+    taken in SECTION_PRIORITY order, whole while they fit, the first one that
+    does not is cut to the remaining budget; the result keeps document order.
+    """
+    if count_tokens(resume_text, model) <= max_tokens:
+        return resume_text
+    sections = split_sections(resume_text)
+    if len(sections) <= 1:
+        return trim_to_tokens(resume_text, max_tokens, model)
+    rank = {name: i for i, name in enumerate(SECTION_PRIORITY)}
+    order = sorted(range(len(sections)), key=lambda i: rank.get(sections[i][0], len(rank)))
+    remaining = max_tokens
+    kept = {}
+    for i in order:
+        # +1 for the blank line that joins sections
+        cost = count_tokens(sections[i][1], model) + 1
+        if cost <= remaining:
+            kept[i] = sections[i][1]
+            remaining -= cost
+        elif remaining >= MIN_SECTION_TOKENS:
+            part = trim_to_tokens(sections[i][1], remaining - 1, model)
+            # end on a whole line unless that throws away most of the part
+            head = part.rsplit("\n", 1)[0]
+            kept[i] = head if len(head) >= len(part) // 2 else part
+            remaining = 0
+    return "\n\n".join(kept[i] for i in sorted(kept))
@@ -0,0 +1,199 @@
+# src/upload_store.py
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
+
+from src.config import UPLOAD_FOLDER, MAX_UPLOAD_FILE_BYTES, PDF_MAX_PAGES, PDF_MAX_CHARS
+from src.resume_parser import extract_pdf
+
+LOG = logging.getLogger("upload_store")
+
+CHUNK_SIZE = 1024 * 1024
+PDF_MAGIC = b"%PDF-"
+MAGIC_WINDOW = 1024  # readers accept the header anywhere in the first 1 KB
+EXTRACT_VERSION = 2  # bump when extract_pdf output changes for the same options
+
+
+def path_for(digest: str, folder=UPLOAD_FOLDER) -> str:
+    return os.path.join(folder, f"{digest}.pdf")
+
+
+def format_size(n):
+    """n bytes for messages: "20 MB", "1.5 MB", "512 KB", "300 bytes"."""
+    for unit, size in (("MB", 1024 * 1024), ("KB", 1024)):
+        if n >= size:
+            return f"{round(n / size, 1):g} {unit}"
+    return f"{n} bytes"
+
+
+class UploadSpool:
+    """
+    Writable file stream the multipart parser spools one uploaded file into:
+    chunks go straight to a temporary file in the upload folder and into a
+    running sha256 as they arrive, so the request body is never held in
+    memory and save_upload only has to rename the file. A file over
+    max_bytes, or without a PDF header in its first bytes, aborts the
+    request while it is still being read.
+    """
+
+    def __init__(self, filename, folder=UPLOAD_FOLDER, max_bytes=MAX_UPLOAD_FILE_BYTES):
+        os.makedirs(folder, exist_ok=True)
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.sha = hashlib.sha256()
+        self._head = b""
+        self.is_pdf = False
+        fd, self.path = tempfile.mkstemp(dir=folder, suffix=".part")
+        self._fh = os.fdopen(fd, "w+b")
+
+    def _check_head(self, data, final=False):
+        self._head += data[:MAGIC_WINDOW - len(self._head)]
+        if PDF_MAGIC in self._head:
+            self.is_pdf = True
+        elif final or len(self._head) >= MAGIC_WINDOW:
+            self.close()
+            raise UnsupportedMediaType(f"{self.filename} is not a PDF file.")
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            self.close()
+            raise RequestEntityTooLarge(f"{self.filename} is larger than {format_size(self.max_bytes)}.")
+        if not self.is_pdf:
+            self._check_head(data)
+        self.sha.update(data)
+        return self._fh.write(data)
+
+    def read(self, size=-1):
+        return self._fh.read(size)
+
+    def seek(self, offset, whence=0):
+        return self._fh.seek(offset, whence)
+
+    def tell(self):
+        return self._fh.tell()
+
+    def flush(self):
+        self._fh.flush()
+
+    def store(self, folder=UPLOAD_FOLDER):
+        """Move the spooled file to its digest path in folder; returns (digest, saved_name, saved_path)."""
+        if not self.is_pdf:
+            self._check_head(b"", final=True)
+        self._fh.close()
+        digest = self.sha.hexdigest()
+        saved_path = path_for(digest, folder)
+        if os.path.exists(saved_path):
+            os.remove(self.path)
+        else:
+            os.makedirs(folder, exist_ok=True)
+            shutil.move(self.path, saved_path)
+        self.path = None
+        return digest, os.path.basename(saved_path), saved_path
+
+    def close(self):
+        # a file the view never stored (skipped or rejected) is removed with the request
+        self._fh.close()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+        self.path = None
+
+    @property
+    def closed(self):
+        return self._fh.closed
+
+
+class DiscardSpool:
+    """Stream for uploads that will be ignored (not .pdf): the bytes are read off the wire and dropped."""
+
+    def write(self, data):
+        return len(data)
+
+    def read(self, size=-1):
+        return b""
+
+    def seek(self, offset, whence=0):
+        return 0
+
+    def tell(self):
+        return 0
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def save_upload(file_storage, folder=UPLOAD_FOLDER):
+    """
+    Store an uploaded PDF under its sha256 digest so each unique file is kept
+    once. Returns (digest, saved_name, saved_path).
+    """
+    if isinstance(file_storage.stream, UploadSpool):
+        # already on disk and hashed while the request was read
+        return file_storage.stream.store(folder)
+    os.makedirs(folder, exist_ok=True)
+    sha = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = file_storage.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                sha.update(chunk)
+                out.write(chunk)
+        digest = sha.hexdigest()
+        saved_path = path_for(digest, folder)
+        if os.path.exists(saved_path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, saved_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return digest, os.path.basename(saved_path), saved_path
+
+
+def extraction_path(saved_path: str) -> str:
+    # the extraction limits are part of the name: changing them re-extracts instead of reusing a cut-off text
+    options = hashlib.sha256(f"{EXTRACT_VERSION}:{PDF_MAX_PAGES}:{PDF_MAX_CHARS}".encode()).hexdigest()[:8]
+    return f"{os.path.splitext(saved_path)[0]}.{options}.json"
+
+
+def extract_pdf_cached(saved_path: str, isolate=None) -> dict:
+    """
+    extract_pdf of a stored PDF (text plus the pages it skipped). The first
+    call parses it and keeps the result next to the file; later calls read
+    that instead. Pages skipped on a time budget are cached too, so a
+    pathological file costs its time budget once. isolate is passed on to
+    extract_pdf.
+    """
+    cache_path = extraction_path(saved_path)
+    try:
+        with open(cache_path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (FileNotFoundError, ValueError):
+        pass
+    extraction = extract_pdf(saved_path, isolate=isolate)
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path) or ".", suffix=".part")
+        with os.fdopen(fd, "w", encoding="utf-8") as out:
+            json.dump(extraction, out)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        LOG.exception("Could not cache extracted text for %s", saved_path)
+    return extraction
+
+
+def extract_text_cached(saved_path: str) -> str:
+    """Text of a stored PDF, parsed at most once (see extract_pdf_cached)."""
+    return extract_pdf_cached(saved_path)["text"]
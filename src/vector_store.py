@@ -0,0 +1,273 @@
+# src/vector_store.py
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+LOG = logging.getLogger("vector_store")
+
+MIN_CAPACITY = 1024
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 50000
+
+
+class _Namespace:
+    """
+    One namespace on disk: a float32 (capacity x dim) memory-mapped matrix of
+    unit vectors plus a SQLite table mapping row -> id/metadata. An optional
+    IVF (inverted file) index over k-means centroids serves approximate queries.
+    """
+
+    def __init__(self, path, dim):
+        self.path = path
+        self.dim = dim
+        self.lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(path, "meta.sqlite"), check_same_thread=False, isolation_level=None,
+                                  timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS rows (row INTEGER PRIMARY KEY, id TEXT UNIQUE, metadata TEXT)")
+        self.count = self._row_count()
+        self.matrix_path = os.path.join(path, "vectors.f32")
+        self.matrix = None
+        self._open(max(MIN_CAPACITY, self.count))
+        self.ivf = self._load_ivf()
+        self._building = False
+
+    # -- storage -------------------------------------------------------------
+
+    def _open(self, capacity):
+        size = capacity * self.dim * 4
+        if not os.path.exists(self.matrix_path) or os.path.getsize(self.matrix_path) < size:
+            with open(self.matrix_path, "ab") as fh:
+                fh.truncate(size)
+        rows = os.path.getsize(self.matrix_path) // (self.dim * 4)
+        if self.matrix is not None:
+            self.matrix.flush()
+        self.matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r+", shape=(rows, self.dim))
+
+    def _row_count(self):
+        # rows are numbered densely from 0 and never deleted
+        return self.db.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM rows").fetchone()[0]
+
+    def refresh(self):
+        """Pick up rows appended by other processes sharing this directory."""
+        with self.lock:
+            n = self._row_count()
+            if n > self.matrix.shape[0]:
+                self._open(n)
+            self.count = n
+            return n
+
+    def upsert(self, vectors):
+        values = np.asarray([v["values"] for v in vectors], dtype=np.float32)
+        if values.ndim != 2 or values.shape[1] != self.dim:
+            raise ValueError(f"expected vectors of dimension {self.dim}")
+        norms = np.linalg.norm(values, axis=1, keepdims=True)
+        values /= np.where(norms == 0, 1, norms)
+        ids = [str(v["id"]) for v in vectors]
+        with self.lock:
+            # BEGIN IMMEDIATE takes the database write lock before rows are numbered, so
+            # processes sharing the directory never hand out the same row twice
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                existing = {}
+                for start in range(0, len(ids), 500):
+                    part = ids[start:start + 500]
+                    q = "SELECT id, row FROM rows WHERE id IN (%s)" % ",".join("?" * len(part))
+                    existing.update(self.db.execute(q, part).fetchall())
+                count = self._row_count()
+                rows = []
+                new_rows = 0
+                for vid in ids:
+                    if vid in existing:
+                        rows.append(existing[vid])
+                    else:
+                        rows.append(count + new_rows)
+                        existing[vid] = rows[-1]
+                        new_rows += 1
+                needed = count + new_rows
+                if needed > self.matrix.shape[0]:
+                    self._open(max(needed, 2 * self.matrix.shape[0]))
+                self.matrix[rows] = values
+                self.matrix.flush()
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO rows (row, id, metadata) VALUES (?, ?, ?)",
+                    [(row, vid, json.dumps(v.get("metadata") or {})) for row, vid, v in zip(rows, ids, vectors)]
+                )
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+            self.count = needed
+            return len(vectors)
+
+    # -- approximate index ---------------------------------------------------
+
+    def _ivf_path(self):
+        return os.path.join(self.path, "ivf.npz")
+
+    def _load_ivf(self):
+        if not os.path.exists(self._ivf_path()):
+            return None
+        data = np.load(self._ivf_path())
+        return {k: data[k] for k in data.files}
+
+    def ivf_stale(self):
+        return self.ivf is None or self.count - int(self.ivf["built"]) > self.count // 10
+
+    def build_ivf_in_background(self):
+        """
+        (Re)build the IVF index on a daemon thread, at most one build at a
+        time. An index written meanwhile by another process is loaded instead.
+        """
+        with self.lock:
+            if self._building:
+                return
+            self._building = True
+
+        def run():
+            try:
+                ivf = self._load_ivf()
+                if ivf is not None and (self.ivf is None or int(ivf["built"]) > int(self.ivf["built"])):
+                    self.ivf = ivf
+                if self.ivf_stale():
+                    self.build_ivf()
+            except Exception:
+                LOG.exception("IVF build failed in %s", self.path)
+            finally:
+                self._building = False
+        threading.Thread(target=run, name="ivf-build", daemon=True).start()
+
+    def build_ivf(self, n_lists=None, seed=0):
+        with self.lock:
+            n = self.count
+            data = self.matrix[:n]
+        if n == 0:
+            return
+        n_lists = n_lists or max(1, int(np.sqrt(n)))
+        rng = np.random.default_rng(seed)
+        sample = data[np.sort(rng.choice(n, size=min(n, KMEANS_SAMPLE), replace=False))]
+        centroids = sample[rng.choice(len(sample), size=min(n_lists, len(sample)), replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(len(centroids)):
+                members = sample[assign == c]
+                if len(members):
+                    mean = members.mean(axis=0)
+                    centroids[c] = mean / (np.linalg.norm(mean) or 1)
+        # assign every row, in blocks to bound memory
+        assign = np.empty(n, dtype=np.int32)
+        for start in range(0, n, 65536):
+            assign[start:start + 65536] = np.argmax(data[start:start + 65536] @ centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable").astype(np.int64)
+        offsets = np.searchsorted(assign[order], np.arange(len(centroids) + 1)).astype(np.int64)
+        ivf = {"centroids": centroids, "order": order, "offsets": offsets, "built": np.int64(n)}
+        tmp = self._ivf_path() + f".{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            np.savez(fh, **ivf)
+        os.replace(tmp, self._ivf_path())
+        self.ivf = ivf
+        LOG.info("Built IVF index over %d vectors with %d lists in %s", n, len(centroids), self.path)
+
+    # -- search --------------------------------------------------------------
+
+    def query(self, vector, top_k, nprobe=None):
+        q = np.array(vector, dtype=np.float32)
+        q /= (np.linalg.norm(q) or 1)
+        n = self.count
+        if n == 0:
+            return []
+        ivf = self.ivf
+        if nprobe and ivf is not None:
+            built = int(ivf["built"])
+            probe = np.argsort(-(ivf["centroids"] @ q))[:nprobe]
+            order, offsets = ivf["order"], ivf["offsets"]
+            rows = np.concatenate([order[offsets[c]:offsets[c + 1]] for c in probe] +
+                                  [np.arange(built, n)])
+            rows.sort()
+            scores = self.matrix[rows] @ q
+        else:
+            rows = None
+            scores = self.matrix[:n] @ q
+        k = min(top_k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        hits = [(int(rows[i]) if rows is not None else int(i), float(scores[i])) for i in best]
+        placeholders = ",".join("?" * len(hits))
+        with self.lock:
+            meta = {row: (vid, md) for row, vid, md in self.db.execute(
+                f"SELECT row, id, metadata FROM rows WHERE row IN ({placeholders})", [r for r, _ in hits])}
+        return [{"id": meta[r][0], "score": s, "metadata": json.loads(meta[r][1])} for r, s in hits if r in meta]
+
+
+class LocalVectorIndex:
+    """
+    In-process drop-in for the Pinecone index used by src.embeddings and
+    src.matcher: same upsert()/query() calls, cosine similarity, results as
+    {"matches": [{"id", "score", "metadata"}]}. Vectors live in memory-mapped
+    float32 files under `path`, one directory per namespace.
+
+    With ann=True, namespaces holding at least ann_min_rows vectors are
+    searched through an IVF index, probing `nprobe` lists. The index is
+    built on a background thread (or offline with build_ann / `python -m
+    src.vector_store`) and rebuilt once more than 10% of the rows were added
+    after the last build; until one exists queries are exact.
+    """
+
+    def __init__(self, path, dim, ann=False, ann_min_rows=50000, nprobe=16):
+        self.path = path
+        self.dim = dim
+        self.ann = ann
+        self.ann_min_rows = ann_min_rows
+        self.nprobe = nprobe
+        self._namespaces = {}
+        self._lock = threading.Lock()
+
+    def _ns(self, namespace):
+        with self._lock:
+            ns = self._namespaces.get(namespace)
+            if ns is None:
+                ns = _Namespace(os.path.join(self.path, namespace or "default"), self.dim)
+                self._namespaces[namespace] = ns
+            return ns
+
+    def upsert(self, vectors, namespace=""):
+        if not vectors:
+            return {"upserted_count": 0}
+        return {"upserted_count": self._ns(namespace).upsert(vectors)}
+
+    def build_ann(self, namespace="", n_lists=None):
+        self._ns(namespace).build_ivf(n_lists=n_lists)
+
+    def query(self, vector, top_k=3, include_metadata=False, namespace=""):
+        ns = self._ns(namespace)
+        ns.refresh()
+        nprobe = None
+        if self.ann and ns.count >= self.ann_min_rows:
+            if ns.ivf_stale():
+                ns.build_ivf_in_background()
+            # rows added after the build are scanned exactly, so a stale index is still correct
+            nprobe = self.nprobe if ns.ivf is not None else None
+        matches = ns.query(vector, top_k, nprobe=nprobe)
+        if not include_metadata:
+            for m in matches:
+                m.pop("metadata", None)
+        return {"matches": matches, "namespace": namespace}
+
+    def describe_index_stats(self):
+        return {"dimension": self.dim,
+                "namespaces": {name: {"vector_count": ns.count} for name, ns in self._namespaces.items()}}
+
+
+if __name__ == "__main__":
+    # offline IVF build for every namespace under LOCAL_VECTOR_DIR, e.g. from a cron job
+    from src.config import LOCAL_VECTOR_DIR, EMBEDDING_DIM
+    logging.basicConfig(level=logging.INFO)
+    index = LocalVectorIndex(LOCAL_VECTOR_DIR, EMBEDDING_DIM)
+    for name in sorted(os.listdir(LOCAL_VECTOR_DIR)) if os.path.isdir(LOCAL_VECTOR_DIR) else []:
+        if os.path.isdir(os.path.join(LOCAL_VECTOR_DIR, name)):
+            index.build_ann(name)
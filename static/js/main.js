@@ -1,3 +1,203 @@
 // static/js/main.js
-// Placeholder for future client-side enhancements (AJAX rewriting, comparison, etc.)
-console.log("main.js loaded");
+// Client-side enhancements for the results page.
+
+// Follow a running analysis job: rank resumes as their ATS scores arrive,
+// attach the AI analysis as it completes, and reload once the job is done.
+(function () {
+  const panel = document.getElementById("jobProgress");
+  if (!panel) return;
+  let progress = JSON.parse(document.getElementById("jobSnapshot").textContent);
+
+  function cell(text, cls) {
+    const td = document.createElement("td");
+    td.textContent = text;
+    if (cls) td.className = cls;
+    return td;
+  }
+
+  function liveScore(r) {
+    const res = r.result || {};
+    if (res.rank_score != null) return res.rank_score;
+    return res.rel_score != null ? res.rel_score : -1;
+  }
+
+  function render() {
+    document.getElementById("jobStage").textContent = progress.stage;
+    document.getElementById("jobBar").style.width = (progress.total ? Math.round(100 * progress.done / progress.total) : 0) + "%";
+    // scored resumes first, by relevance; the rest keep upload order. The
+    // dashboard's rank_score needs the whole batch, so this order is provisional
+    const rows = progress.resumes.slice().sort(function (a, b) {
+      return liveScore(b) - liveScore(a);
+    });
+    const body = document.getElementById("liveRanking");
+    body.innerHTML = "";
+    rows.forEach(function (r, i) {
+      const res = r.result || {};
+      const llm = res.llm_analysis || {};
+      const tr = document.createElement("tr");
+      tr.className = "border-b";
+      tr.appendChild(cell(i + 1, "py-2"));
+      tr.appendChild(cell(r.name));
+      tr.appendChild(cell(res.rel_score != null ? res.rel_score : "—"));
+      tr.appendChild(cell(res.kw_score != null ? res.kw_score : "—"));
+      tr.appendChild(cell(llm.quick_recommendation || llm.raw || ""));
+      tr.appendChild(cell(r.status, "text-gray-500"));
+      body.appendChild(tr);
+    });
+  }
+
+  function finish() {
+    window.location.reload();
+  }
+
+  // Fallback for browsers without EventSource: poll the job status
+  function poll() {
+    fetch(panel.dataset.statusUrl, { headers: { Accept: "application/json" } })
+      .then(function (res) { return res.json(); })
+      .then(function (job) {
+        progress = job.progress || progress;
+        render();
+        if (job.status === "done" || job.status === "failed") {
+          finish();
+        } else {
+          setTimeout(poll, 1500);
+        }
+      })
+      .catch(function () { setTimeout(poll, 5000); });
+  }
+
+  if (!window.EventSource) {
+    setTimeout(poll, 1000);
+    return;
+  }
+
+  const source = new EventSource(panel.dataset.eventsUrl);
+  source.addEventListener("snapshot", function (e) {
+    progress = JSON.parse(e.data).progress;
+    render();
+  });
+  source.addEventListener("stage", function (e) {
+    progress.stage = JSON.parse(e.data).stage;
+    render();
+  });
+  source.addEventListener("resume", function (e) {
+    const data = JSON.parse(e.data);
+    progress.done = data.done;
+    progress.resumes[data.index] = { name: data.name, status: data.status, result: data.result };
+    render();
+  });
+  ["done", "failed"].forEach(function (name) {
+    source.addEventListener(name, function () {
+      source.close();
+      finish();
+    });
+  });
+})();
+
+// Rewrite a candidate's achievement bullets with one bulk request
+document.querySelectorAll("[data-rewrite-bullets]").forEach(function (button) {
+  button.addEventListener("click", function () {
+    const items = button.parentElement.querySelectorAll("[data-achievements] li");
+    const bullets = Array.prototype.map.call(items, function (li) { return li.dataset.bullet; });
+    button.disabled = true;
+    button.textContent = "Rewriting…";
+    fetch("/rewrite_bullets", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ bullets: bullets })
+    })
+      .then(function (res) { return res.json(); })
+      .then(function (data) {
+        (data.rewritten || []).forEach(function (text, i) {
+          if (!text) return;
+          const p = document.createElement("div");
+          p.className = "text-sky-700 ml-5";
+          p.textContent = "→ " + text;
+          items[i].appendChild(p);
+        });
+        // "failed" lists the bullets the server could not rewrite
+        const failed = data.error ? bullets.length : (data.failed || []).length;
+        if (failed === 0) {
+          button.textContent = "Rewritten";
+        } else if (failed >= bullets.length) {
+          button.disabled = false;  // nothing was added, so a retry starts clean
+          button.textContent = "Rewrite failed — retry";
+        } else {
+          button.textContent = (bullets.length - failed) + " of " + bullets.length + " rewritten, " + failed + " failed";
+        }
+      })
+      .catch(function () {
+        button.disabled = false;
+        button.textContent = "Rewrite failed — retry";
+      });
+  });
+});
+
+// Stream a tailored full-resume rewrite into the page; "Stop" aborts the request,
+// which also cancels the completion on the server
+document.querySelectorAll("[data-rewrite-full]").forEach(function (box) {
+  const start = box.querySelector("[data-rewrite-start]");
+  const stop = box.querySelector("[data-rewrite-stop]");
+  const output = box.querySelector("[data-rewrite-output]");
+  let controller = null;
+
+  function finish(label) {
+    controller = null;
+    start.disabled = false;
+    start.textContent = label;
+    stop.classList.add("hidden");
+  }
+
+  function handle(block) {
+    let event = "message";
+    let data = "";
+    block.split("\n").forEach(function (line) {
+      if (line.indexOf("event: ") === 0) event = line.slice(7);
+      else if (line.indexOf("data: ") === 0) data += line.slice(6);
+    });
+    if (event === "chunk") output.textContent += JSON.parse(data).text;
+    else if (event === "done") finish("Rewrite again");
+    else if (event === "error") finish("Rewrite failed — retry");
+  }
+
+  start.addEventListener("click", function () {
+    controller = new AbortController();
+    start.disabled = true;
+    start.textContent = "Writing…";
+    stop.classList.remove("hidden");
+    output.classList.remove("hidden");
+    output.textContent = "";
+    fetch("/rewrite_full/stream", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ resume: box.dataset.resume, job: box.dataset.job }),
+      signal: controller.signal
+    })
+      .then(function (res) {
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        function pump() {
+          return reader.read().then(function (result) {
+            if (result.done) return;
+            buffer += decoder.decode(result.value, { stream: true });
+            let end;
+            while ((end = buffer.indexOf("\n\n")) >= 0) {
+              handle(buffer.slice(0, end));
+              buffer = buffer.slice(end + 2);
+            }
+            return pump();
+          });
+        }
+        return pump();
+      })
+      .catch(function (err) {
+        if (err.name !== "AbortError") finish("Rewrite failed — retry");
+      });
+  });
+
+  stop.addEventListener("click", function () {
+    if (controller) controller.abort();
+    finish("Rewrite again");
+  });
+});
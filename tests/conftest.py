@@ -0,0 +1,12 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+
+# keep caches, uploads and databases of the code under test out of data/
+_workdir = tempfile.mkdtemp(prefix="resume-tests-")
+for name, sub in [("CACHE_DIR", "cache"), ("UPLOAD_FOLDER", "uploads"), ("JOBS_DB", "jobs.sqlite"),
+                  ("CANDIDATES_DB", "candidates.sqlite"), ("LOCAL_VECTOR_DIR", "vectors")]:
+    os.environ.setdefault(name, os.path.join(_workdir, sub))
+os.environ.setdefault("VECTOR_BACKEND", "local")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,31 @@
+# tests/test_matcher.py
+import pytest
+
+from benchmarks.stubs import StubIndex, StubOpenAI
+from src import config
+from src.embeddings import store_embeddings
+from src.matcher import find_best_match
+
+TEXTS = {"r1": "Python developer, Django and PostgreSQL", "r2": "Data engineer, Spark and Airflow",
+         "r3": "Frontend developer, React and TypeScript"}
+
+
+@pytest.fixture
+def index(monkeypatch):
+    monkeypatch.setattr(config, "_openai_client", StubOpenAI(dim=config.EMBEDDING_DIM))
+    monkeypatch.setattr(config, "_index", StubIndex())
+    monkeypatch.setattr(config, "_index_checked", float("inf"))
+    store_embeddings((i, text, {"filename": f"{i}.pdf"}) for i, text in TEXTS.items())
+
+
+def test_query_text_finds_its_own_vector(index):
+    matches = find_best_match(TEXTS["r1"], top_k=2)["matches"]
+
+    assert matches[0]["id"] == "r1"
+    assert matches[0]["score"] == pytest.approx(1.0, abs=1e-4)
+
+
+def test_excluded_ids_are_left_out(index):
+    matches = find_best_match(TEXTS["r1"], top_k=2, exclude_ids=["r1"])["matches"]
+
+    assert sorted(m["id"] for m in matches) == ["r2", "r3"]
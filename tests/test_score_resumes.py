@@ -0,0 +1,101 @@
+# tests/test_score_resumes.py
+import os
+import threading
+
+import pytest
+
+from benchmarks.corpus import make_job_lines, make_resume_lines, write_pdf
+from src import pipeline, resume_parser
+from src.job_profile import JobProfile
+
+
+@pytest.fixture
+def batch(tmp_path):
+    calls = []
+
+    def make(n):
+        calls.append(n)
+        paths = []
+        for i in range(n):
+            path = str(tmp_path / f"batch{len(calls)}-resume-{i}.pdf")
+            write_pdf(make_resume_lines("small", i), path)
+            paths.append(path)
+        return paths
+    return make
+
+
+@pytest.fixture
+def job():
+    return JobProfile.from_text("\n".join(make_job_lines("small", 0)))
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    monkeypatch.setattr(pipeline, "ATS_WORKERS", 2)
+    pipeline._reset_pool()
+    yield
+    pipeline._reset_pool()
+
+
+def _tagged_score(saved_path, job, **kwargs):
+    # runs in the worker process (forked after the patch below), so it reports that process
+    return {**_original_score(saved_path, job, **kwargs), "_pid": os.getpid()}
+
+
+_original_score = pipeline.score_resume_file
+
+
+def test_batch_uses_process_pool(monkeypatch, batch, job, workers):
+    def not_inline(saved_path, job):
+        raise AssertionError("batch scored inline")
+    monkeypatch.setattr(pipeline, "_score_inline", not_inline)
+
+    results = pipeline.score_resumes(batch(4), job)
+
+    assert pipeline._pool is not None
+    assert all("error" not in r for r in results)
+
+
+def test_parallel_batch_matches_inline(monkeypatch, batch, job, workers):
+    paths = batch(20)
+    monkeypatch.setattr(pipeline, "score_resume_file", _tagged_score)
+    seen = []
+
+    results = pipeline.score_resumes(paths, job, on_result=lambda i, r: seen.append(i))
+    expected = pipeline.score_resumes(paths, job, inline=True)
+
+    assert sorted(seen) == list(range(20))
+    assert all(r["_pid"] != os.getpid() for r in results)
+    for r, e in zip(results, expected):
+        assert (r["rel_score"], r["kw_score"], r["resume_text"]) == (e["rel_score"], e["kw_score"], e["resume_text"])
+
+
+def test_single_resume_runs_inline(monkeypatch, batch, job, workers):
+    results = pipeline.score_resumes(batch(1), job)
+
+    assert pipeline._pool is None
+    assert "error" not in results[0]
+
+
+def _off_main_thread(fn):
+    out = []
+    t = threading.Thread(target=lambda: out.append(fn()))
+    t.start()
+    t.join()
+    return out[0]
+
+
+def test_only_single_file_extraction_is_isolated(monkeypatch, batch, job):
+    isolated = []
+    real = resume_parser._extract_isolated
+
+    def record(source, *args):
+        isolated.append(source)
+        return real(source, *args)
+    monkeypatch.setattr(resume_parser, "_extract_isolated", record)
+
+    _off_main_thread(lambda: pipeline.score_resumes(batch(3), job, inline=True))
+    assert isolated == []
+
+    results = _off_main_thread(lambda: pipeline.score_resumes(batch(1), job))
+    assert len(isolated) == 1 and "error" not in results[0]
@@ -0,0 +1,20 @@
+# tests/test_upload_store.py
+import pytest
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from src.upload_store import UploadSpool, format_size
+
+
+@pytest.mark.parametrize("n, text", [(20 * 1024 * 1024, "20 MB"), (1536 * 1024, "1.5 MB"),
+                                     (512 * 1024, "512 KB"), (300, "300 bytes")])
+def test_format_size(n, text):
+    assert format_size(n) == text
+
+
+def test_oversized_upload_names_the_cap(tmp_path):
+    spool = UploadSpool("cv.pdf", folder=str(tmp_path), max_bytes=512 * 1024)
+    try:
+        with pytest.raises(RequestEntityTooLarge, match="larger than 512 KB"):
+            spool.write(b"%PDF-" + b"x" * (600 * 1024))
+    finally:
+        spool.close()